@@ -0,0 +1,155 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chippy
+from synthetic import generate, leagues
+
+
+
+# Benchmarks of Chippy's hot paths on synthetic FBref tables served by the local data source: table load, name
+# lookup, extraction and rendering for every chart. No network and no soccerdata cache needed, the same seed
+# always gives the same tables.
+
+results_dir = Path(__file__).resolve().parent / "results"
+
+# Run fn repeat times (after setup each time, untimed) and keep the best and median wall time in ms
+def measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3)}
+
+# Loading a table cold: reading its files, StatTable, name index and the per 90 metrics of every chart
+def bench_load(fbref, repeat):
+    results = {}
+    for stat_type in chippy.stat_types:
+        def load():
+            table = chippy.read_stat_table(fbref, stat_type)
+            table.names
+            table.charted()
+
+        results[f"load/{stat_type}"] = measure(load, repeat, setup=chippy.table_cache.clear)
+    return results
+
+# Every lookup tier on the standard table and misspelt names, 100 queries per run
+def bench_lookup(fbref, repeat):
+    table = chippy.read_stat_table(fbref, "standard")
+    names = list(table.frame.index.get_level_values("player")[::max(1, len(table.frame) // 100)])[:100]
+    queries = {
+        "exact": names,
+        "prefix": [name[:5] for name in names],
+        "token": [name.split(" ")[-1] for name in names],
+        "folded": [chippy.fold_name(name).upper() for name in names],
+        "missing": [f"zz{i}" for i in range(100)],
+    }
+    misspelt = [name[:3] + name[4:] for name in names]
+    table.names.trigrams
+    results = {}
+    for tier, batch in queries.items():
+        results[f"lookup/{tier}"] = measure(lambda: [table.names.lookup(query) for query in batch], repeat)
+    results["lookup/fuzzy"] = measure(lambda: [table.names.fuzzy(query) for query in misspelt], repeat)
+    results["lookup/index"] = measure(lambda: table.names, repeat, setup=lambda: setattr(table, "_names", None))
+    results["lookup/trigrams"] = measure(lambda: table.names.trigrams, repeat, setup=lambda: setattr(table.names, "_trigrams", None))
+    return results
+
+# Extracting both players of a comparison for every chart, tables already loaded
+def bench_extract(fbref, repeat):
+    for stat_type in chippy.stat_types:
+        chippy.warm_table(fbref, stat_type)
+    results = {}
+    for statistic, spec in chippy.chart_specs.items():
+        results[f"extract/{statistic}"] = measure(lambda: [chippy.extract_player(spec, fbref, name) for name in ("Mesut", "De Bruyne")], repeat)
+    return results
+
+# Drawing and encoding every chart to PNG
+def bench_render(fbref, repeat):
+    results = {}
+    for statistic, spec in chippy.chart_specs.items():
+        players = [chippy.extract_player(spec, fbref, name) for name in ("Mesut", "De Bruyne")]
+        results[f"render/{statistic}"] = measure(lambda: chippy.render_image(statistic, players, "png"), repeat)
+    return results
+
+# The menu's input parsing, 1000 calls per run
+def bench_input(repeat):
+    seasons = ["2017/18", "2017/2018", "17/18", "1718", "2017"] * 200
+    names = ["ENG", "La Liga", "3", "Germany", "nope"] * 200
+    return {
+        "input/season_format": measure(lambda: [chippy.season_format(season) for season in seasons], repeat),
+        "input/league_format": measure(lambda: [chippy.league_format(name) for name in names], repeat),
+    }
+
+suites = {"load": bench_load, "lookup": bench_lookup, "extract": bench_extract, "render": bench_render}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+# Print this run, next to an earlier one when given
+def report(run, baseline=None):
+    print(f"Chippy benchmarks @ {run['commit']} ({run['players']} players x {len(run['leagues'])} leagues, best of {run['repeat']})")
+    print(f"\t{'case':<32}{'min ms':>10}{'median ms':>11}" + (f"{'baseline':>10}{'change':>9}" if baseline else ""))
+    for case, timing in run["results"].items():
+        line = f"\t{case:<32}{timing['min_ms']:>10.3f}{timing['median_ms']:>11.3f}"
+        if baseline and case in baseline["results"]:
+            before = baseline["results"][case]["min_ms"]
+            line += f"{before:>10.3f}{(timing['min_ms'] / before - 1) * 100 if before else 0:>+8.1f}%"
+        print(line)
+
+def benchmark(fbref, args):
+    run = {
+        "commit": git_commit(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "data": args.data or "synthetic",
+        "players": len(chippy.read_stat_table(fbref, "standard").frame) // len(fbref.leagues),
+        "leagues": fbref.leagues,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    for name in args.only or list(suites) + ["input"]:
+        run["results"].update(bench_input(args.repeat) if name == "input" else suites[name](fbref, args.repeat))
+    return run
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Chippy's load, lookup, extraction and render paths on synthetic data")
+    parser.add_argument("--data", help="tables made by synthetic.py or 'chippy.py record' (default: generate them)")
+    parser.add_argument("--season", default="2223", help="season key of the tables (default: 2223)")
+    parser.add_argument("--players", type=int, default=500, help="players per league when generating (default: 500)")
+    parser.add_argument("--leagues", type=int, default=5, choices=range(1, 6), help="leagues in the table (default: 5)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (default: 5)")
+    parser.add_argument("--only", choices=list(suites) + ["input"], action="append", help="run only these suites")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--out", help=f"results file (default: {results_dir.name}/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    chippy.plt.switch_backend("Agg")
+    with tempfile.TemporaryDirectory() as generated:
+        if not args.data:
+            generate(generated, leagues[:args.leagues], [args.season], args.players)
+        chippy.use_local_data(args.data or generated)
+        run = benchmark(chippy.get_fbref(leagues[:args.leagues], args.season), args)
+
+    out = Path(args.out) if args.out else results_dir / f"{run['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(run, indent=2))
+    report(run, json.loads(Path(args.compare).read_text()) if args.compare else None)
+    print(f"Saved to {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chippy
+
+
+
+# Deterministic FBref-shaped player tables for the benchmarks and --data-dir: the same (league, season, team, player) index and
+# (group, column) MultiIndex columns soccerdata's read_player_season_stats returns, made up from a seed, no network.
+
+first_names = ["Mesut", "Kevin", "Bernardo", "David", "Bruno", "Mohamed", "Harry", "Martin", "Jérôme", "Thiago",
+               "Luka", "İlkay", "Son", "Joško", "Raphaël", "Pedri", "Gonçalo", "Nicolò", "Ángel", "Sébastien"]
+last_names = ["Özil", "De Bruyne", "Silva", "Fernandes", "Salah", "Kane", "Ødegaard", "Müller", "Alcántara", "Modrić",
+              "Gündoğan", "Heung-min", "Gvardiol", "Varane", "González", "Ramos", "Barella", "Di María", "Haller", "Núñez"]
+
+leagues = ["ENG-Premier League", "ESP-La Liga", "FRA-Ligue 1", "GER-Bundesliga", "ITA-Serie A"]
+
+# Mean per 90 of every counting column, the percentage columns are worked out from the counts
+rates = {
+    "standard": {
+        ("Performance", "Gls"): 0.25, ("Performance", "Ast"): 0.18, ("Performance", "PK"): 0.03, ("Performance", "CrdY"): 0.2,
+        ("Expected", "xG"): 0.24, ("Expected", "xAG"): 0.17, ("Progression", "PrgC"): 2.0, ("Progression", "PrgP"): 3.5, ("Progression", "PrgR"): 4.0,
+    },
+    "shooting": {
+        ("Standard", "Gls"): 0.25, ("Standard", "Sh"): 1.8, ("Standard", "SoT"): 0.6, ("Standard", "FK"): 0.05, ("Expected", "xG"): 0.24,
+    },
+    "passing": {
+        ("Short", "Att"): 18.0, ("Medium", "Att"): 17.0, ("Long", "Att"): 5.0,
+        ("Ast", ""): 0.18, ("xAG", ""): 0.17, ("xA", ""): 0.15, ("KP", ""): 1.2, ("1/3", ""): 3.0, ("PPA", ""): 0.8, ("CrsPA", ""): 0.2, ("PrgP", ""): 3.5,
+    },
+    "goal_shot_creation": {
+        ("SCA Types", "PassLive"): 1.8, ("SCA Types", "PassDead"): 0.3, ("SCA Types", "TO"): 0.2, ("SCA Types", "Sh"): 0.2, ("SCA Types", "Fld"): 0.2,
+        ("GCA Types", "PassLive"): 0.15, ("GCA Types", "PassDead"): 0.03, ("GCA Types", "TO"): 0.02, ("GCA Types", "Sh"): 0.02,
+    },
+    "possession": {
+        ("Touches", "Def Pen"): 3.0, ("Touches", "Def 3rd"): 15.0, ("Touches", "Mid 3rd"): 25.0, ("Touches", "Att 3rd"): 18.0, ("Touches", "Att Pen"): 3.0,
+        ("Take-Ons", "Att"): 2.0, ("Carries", "Carries"): 35.0, ("Carries", "PrgC"): 2.0, ("Carries", "1/3"): 1.5, ("Carries", "CPA"): 0.6,
+        ("Receiving", "Rec"): 40.0, ("Receiving", "PrgR"): 4.0,
+    },
+    "passing_types": {
+        ("Pass Types", "Live"): 40.0, ("Pass Types", "Dead"): 4.0, ("Pass Types", "FK"): 1.0, ("Pass Types", "TB"): 0.4,
+        ("Pass Types", "Sw"): 0.8, ("Pass Types", "Crs"): 1.5, ("Pass Types", "TI"): 1.0, ("Pass Types", "CK"): 0.5,
+    },
+}
+
+expected_goals = {("Expected", "xG"), ("Expected", "xAG"), ("xAG", ""), ("xA", "")}
+
+stat_types = list(rates)
+
+# Unique, accented, FBref-looking names, the first ones being the defaults of the menu
+def player_names(n, seed=0):
+    rng = np.random.default_rng(seed)
+    names = ["Mesut Özil", "Kevin De Bruyne"]
+    seen = set(names)
+    while len(names) < n:
+        name = f"{first_names[rng.integers(len(first_names))]} {last_names[rng.integers(len(last_names))]}"
+        if name in seen:
+            name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names[:n]
+
+# The players of every (league, season) with their minutes and a per player style, shared by all six tables
+def squads(leagues=leagues, seasons=("2223",), players=500, seed=0):
+    rows = []
+    for l, league in enumerate(leagues):
+        for season in seasons:
+            names = player_names(players, seed + 1000 * l)
+            for i, name in enumerate(names):
+                rows.append((league, str(season), f"{league.split('-')[0]} Team {i % 20 + 1}", name))
+    rng = np.random.default_rng(seed)
+    nineties = np.round(rng.uniform(0.1, 38.0, len(rows)), 1)
+    style = rng.lognormal(0.0, 0.5, (len(rows), 4))
+    return pd.MultiIndex.from_tuples(rows, names=["league", "season", "team", "player"]), nineties, style
+
+# One stat table for the given squads, seeded by stat_type so every table is reproducible on its own
+def stat_table(stat_type, index, nineties, style, seed=0):
+    rng = np.random.default_rng(seed + stat_types.index(stat_type) + 1)
+    n = len(index)
+    columns = {("nation", ""): np.array(["eng ENG", "esp ESP", "fra FRA", "ger GER", "ita ITA"])[np.arange(n) % 5],
+               ("pos", ""): np.array(["FW", "MF", "DF", "MF,FW", "GK"])[np.arange(n) % 5],
+               ("age", ""): (18 + np.arange(n) % 18).astype(str),
+               ("born", ""): (1987 + np.arange(n) % 18).astype(float)}
+    if stat_type == "standard":
+        columns[("Playing Time", "MP")] = np.ceil(nineties * 1.1)
+        columns[("Playing Time", "Min")] = np.round(nineties * 90)
+        columns[("Playing Time", "90s")] = nineties
+    else:
+        columns[("90s", "")] = nineties
+
+    for i, (column, rate) in enumerate(rates[stat_type].items()):
+        expected = rate * nineties * style[:, i % style.shape[1]]
+        if column in expected_goals:
+            columns[column] = np.round(expected * rng.uniform(0.7, 1.3, n), 1)
+        else:
+            columns[column] = rng.poisson(expected).astype(float)
+
+    # Completions and success rates are always at most the attempts
+    if stat_type == "passing":
+        for group in ("Short", "Medium", "Long"):
+            columns[(group, "Cmp")] = np.floor(columns[(group, "Att")] * rng.uniform(0.55, 0.92, n))
+        columns[("Total", "Att")] = columns[("Short", "Att")] + columns[("Medium", "Att")] + columns[("Long", "Att")] + rng.poisson(nineties)
+        columns[("Total", "Cmp")] = columns[("Short", "Cmp")] + columns[("Medium", "Cmp")] + columns[("Long", "Cmp")]
+        columns[("Total", "Cmp%")] = percentage(columns[("Total", "Cmp")], columns[("Total", "Att")])
+    elif stat_type == "shooting":
+        columns[("Standard", "SoT")] = np.minimum(columns[("Standard", "SoT")], columns[("Standard", "Sh")])
+        columns[("Standard", "Gls")] = np.minimum(columns[("Standard", "Gls")], columns[("Standard", "SoT")])
+        columns[("Standard", "G/Sh")] = np.round(np.divide(columns[("Standard", "Gls")], columns[("Standard", "Sh")], out=np.zeros(n), where=columns[("Standard", "Sh")] > 0), 2)
+    elif stat_type == "possession":
+        columns[("Take-Ons", "Succ")] = np.floor(columns[("Take-Ons", "Att")] * rng.uniform(0.3, 0.7, n))
+        columns[("Take-Ons", "Succ%")] = percentage(columns[("Take-Ons", "Succ")], columns[("Take-Ons", "Att")])
+    elif stat_type == "passing_types":
+        others = columns[("Pass Types", "TB")] + columns[("Pass Types", "Sw")] + columns[("Pass Types", "Crs")]
+        columns[("Pass Types", "Live")] = np.maximum(columns[("Pass Types", "Live")], others + 1)
+        columns[("Att", "")] = columns[("Pass Types", "Live")] + columns[("Pass Types", "Dead")]
+
+    frame = pd.DataFrame(columns, index=index)
+    frame.columns = pd.MultiIndex.from_tuples(frame.columns)
+    return frame.sort_index()
+
+def percentage(part, whole):
+    return np.round(np.divide(part * 100, whole, out=np.full(len(part), np.nan), where=whole > 0), 1)
+
+# Write every stat table for the given leagues and seasons as chippy's local files (chippy.py --data-dir)
+def generate(directory, leagues=leagues, seasons=("2223",), players=500, seed=0, fmt="parquet"):
+    index, nineties, style = squads(leagues, seasons, players, seed)
+    paths = []
+    for stat_type in stat_types:
+        paths += chippy.save_local_tables(stat_table(stat_type, index, nineties, style, seed), directory, stat_type, fmt)
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic FBref player tables for chippy.py --data-dir")
+    parser.add_argument("out", help="output directory")
+    parser.add_argument("--players", type=int, default=500, help="players per league and season (default: 500)")
+    parser.add_argument("--seasons", nargs="+", default=["2223"], help="season keys (default: 2223)")
+    parser.add_argument("--leagues", type=int, default=5, choices=range(1, 6), help="leagues (default: 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", default="parquet", choices=["parquet", "csv"])
+    args = parser.parse_args()
+    paths = generate(args.out, leagues[:args.leagues], args.seasons, args.players, args.seed, args.format)
+    print(f"Wrote {len(paths)} tables for {args.players * args.leagues * len(args.seasons)} players to {args.out}")
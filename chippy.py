@@ -1,8 +1,172 @@
-import soccerdata as sd
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from math import pi
+import time
+
+# Taken before anything else is imported, for --profile-startup
+started = time.perf_counter()
+
+import argparse
+import atexit
+import csv
+import hashlib
+import heapq
+import importlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+# Heavy modules are imported on first use, so the menu and bad input never wait for them
+import_timings = {}
+import_lock = threading.Lock()
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        if self._module is None:
+            with import_lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    import_timings[self._name] = time.perf_counter() - start
+                    self.__dict__["_module"] = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+sd = LazyModule("soccerdata")
+pd = LazyModule("pandas")
+plt = LazyModule("matplotlib.pyplot")
+np = LazyModule("numpy")
+
+# --profile-startup: time to the first prompt, then what each heavy import cost once the run ends
+def profile_startup():
+    print(f"Chippy: Started in {round((time.perf_counter() - started) * 1000)}ms")
+
+    def report():
+        print("Chippy: Import timings")
+        for name, seconds in sorted(import_timings.items(), key=lambda item: -item[1]):
+            print(f"\t{name}: {round(seconds * 1000)}ms")
+
+    atexit.register(report)
+
+# Instrumentation: wall time per stage and counters for each comparison, recorded by whichever thread runs it
+class Trace:
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.stages = {}
+        self.counters = {}
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        if self.elapsed is not None:  # Stages timed elsewhere after stop(), like a render in a worker process
+            self.elapsed += seconds
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def count(self, counter, n=1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def record(self):
+        return {
+            "label": self.label,
+            "total_seconds": round(self.elapsed if self.elapsed is not None else time.perf_counter() - self.started, 4),
+            "stages": {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+            "counters": self.counters,
+        }
+
+trace_state = threading.local()
+trace_lock = threading.Lock()
+trace_records = []
+trace_path = None
+
+@contextmanager
+def activate(trace):
+    previous = getattr(trace_state, "trace", None)
+    trace_state.trace = trace
+    try:
+        yield trace
+    finally:
+        trace_state.trace = previous
+
+# Keep a finished trace, and append it to the --trace JSON lines file
+def finish_trace(trace):
+    record = trace.record()
+    with trace_lock:
+        trace_records.append(record)
+        if trace_path:
+            with open(trace_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+    return record
+
+# Trace everything this thread does until the block ends, as one comparison
+@contextmanager
+def traced(label):
+    trace = Trace(label)
+    try:
+        with activate(trace):
+            yield trace
+    finally:
+        finish_trace(trace)
+
+# Time a stage of the comparison being traced on this thread (nothing is recorded outside a trace)
+@contextmanager
+def timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = getattr(trace_state, "trace", None)
+        if trace is not None:
+            trace.add(stage, time.perf_counter() - start)
+
+def counted(counter, n=1):
+    trace = getattr(trace_state, "trace", None)
+    if trace is not None:
+        trace.count(counter, n)
+
+# Stage and counter totals over every trace so far, for --trace-summary
+def trace_summary(records=None):
+    records = trace_records if records is None else records
+    stages = {}
+    counters = {}
+    for record in records:
+        for stage, seconds in record["stages"].items():
+            stages.setdefault(stage, []).append(seconds)
+        for counter, n in record["counters"].items():
+            counters[counter] = counters.get(counter, 0) + n
+
+    print(f"Chippy: {len(records)} comparison(s) traced")
+    print(f"\t{'stage':<14}{'traces':>7}{'total s':>10}{'mean s':>10}{'max s':>10}")
+    for stage, seconds in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        print(f"\t{stage:<14}{len(seconds):>7}{sum(seconds):>10.3f}{sum(seconds) / len(seconds):>10.3f}{max(seconds):>10.3f}")
+    for counter, n in sorted(counters.items()):
+        print(f"\t{counter}: {n}")
+
+    # Over the whole process, not just the traced comparisons
+    tables = table_cache.stats()
+    print(f"\ttable cache: {tables['tables']} tables, {tables['bytes'] / 2**20:.1f} of {tables['max_bytes'] / 2**20:.0f} MB, {tables['hits']} hits, {tables['misses']} misses")
+    images = image_cache.stats()
+    if images["hits"] or images["misses"]:
+        print(f"\timage cache: {(images['bytes'] or 0) / 2**20:.1f} of {images['max_bytes'] / 2**20:.0f} MB, {images['hits']} hits, {images['misses']} misses")
 
 
 
@@ -53,6 +217,7 @@ def season_display(year):
 
 # Format league
 def league_format(league):
+    if (league in big_five_leagues): return league
     if (league == "ENG" or league == "England" or league == "1" or league == "Premier League"): return "ENG-Premier League"
     elif (league == "ESP" or league == "Spain" or league == "2" or league == "La Liga"): return "ESP-La Liga"
     elif (league == "ITA" or league == "Italy" or league == "3" or league == "Serie A"): return "ITA-Serie A"
@@ -62,15 +227,610 @@ def league_format(league):
     else:
         return False
 
-# Fetch player stats
+# Every league Chippy knows, in menu order
+big_five_leagues = ["ENG-Premier League", "ESP-La Liga", "ITA-Serie A", "GER-Bundesliga", "FRA-Ligue 1"]
+
+# FBref reader pool, one reader per (league, season) for the whole session
+fbref_readers = {}
+fbref_lock = threading.Lock()
+
+# Player tables saved as files, one per (league, season, stat type), in the layout soccerdata caches its pages:
+# players_ENG-Premier League_2223_standard.parquet (or .csv). Made by 'chippy.py record' or benchmarks/synthetic.py.
+class LocalFBref:
+    def __init__(self, directory, leagues, seasons):
+        self.directory = Path(directory)
+        self.leagues = [leagues] if isinstance(leagues, str) else list(leagues)
+        self.seasons = [season_key(season) for season in ([seasons] if isinstance(seasons, (str, int)) else seasons)]
+        self.data_dir = None  # The files are already parsed, there is nothing to snapshot
+
+    def read_player_season_stats(self, stat_type="standard"):
+        frames = [read_local_table(self.directory, league, season, stat_type) for league in self.leagues for season in self.seasons]
+        return pd.concat(frames).sort_index() if len(frames) > 1 else frames[0]
+
+# soccerdata's season key: 2017 is "1718", "1718" and "2021" (2020/21) stay as they are
+def season_key(season):
+    season = str(season)
+    if len(season) == 4 and season.isdigit() and int(season[2:]) == (int(season[:2]) + 1) % 100:
+        return season
+    if len(season) == 4 and season[:2] in ("19", "20"):
+        return f"{season[2:]}{(int(season[2:]) + 1) % 100:02d}"
+    return season
+
+def local_table_path(directory, league, season, stat_type, fmt="parquet"):
+    return Path(directory) / f"players_{league}_{season}_{stat_type}.{fmt}"  # season is already a key
+
+def read_local_table(directory, league, season, stat_type):
+    path = local_table_path(directory, league, season, stat_type)
+    if path.exists():
+        counted("bytes_read", path.stat().st_size)
+        return pd.read_parquet(path)
+
+    path = path.with_suffix(".csv")
+    if not path.exists():
+        raise FileNotFoundError(f"no {stat_type} table for {league} {season} in {directory}")
+    counted("bytes_read", path.stat().st_size)
+    # Index columns stay text, or season "0910" would come back as 910
+    frame = pd.read_csv(path, header=[0, 1], index_col=[0, 1, 2, 3], dtype={column: str for column in range(4)})
+    # Single level columns like 90s come back from CSV as ("90s", "Unnamed: 4_level_1")
+    frame.columns = pd.MultiIndex.from_tuples([(group, "" if column.startswith("Unnamed:") else column) for group, column in frame.columns])
+    return frame
+
+# Save a player table as local files, split by league and season
+def save_local_tables(frame, directory, stat_type, fmt="parquet"):
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    paths = []
+    for (league, season), part in frame.groupby(level=["league", "season"], sort=False):
+        path = local_table_path(directory, league, season, stat_type, fmt)
+        if fmt == "csv":
+            part.to_csv(path)
+        else:
+            part.to_parquet(path)
+        paths.append(path)
+    return paths
+
+# Where readers come from: soccerdata's FBref scraper, or the files in local_dir (--data-dir)
+data_sources = {
+    "fbref": lambda league, season: sd.FBref(leagues=league, seasons=season),
+    "local": lambda league, season: LocalFBref(local_dir, league, season),
+}
+data_source = "fbref"
+local_dir = None
+
+# Read tables from files in directory instead of FBref, for every reader built from now on
+def use_local_data(directory):
+    global data_source, local_dir
+    data_source = "local"
+    local_dir = Path(directory)
+    with fbref_lock:
+        fbref_readers.clear()
+
+# Get (or build) the shared reader for a league and season (or lists of leagues and seasons, read in one go)
+def get_fbref(league, season):
+    if isinstance(season, (list, tuple)):
+        season = [str(s) for s in season]
+        key = (",".join(season),)
+    else:
+        key = (str(season),)
+    if isinstance(league, (list, tuple)):
+        league = list(league)
+        key = (",".join(league),) + key
+    else:
+        key = (league,) + key
+    with fbref_lock:
+        fbref = fbref_readers.get(key)
+        if fbref is None:
+            counted("reader_misses")
+            with timed("reader"):
+                fbref = data_sources[data_source](league, season)
+            fbref_readers[key] = fbref
+        else:
+            counted("reader_hits")
+    return fbref
+
+# LRU cache of parsed stat tables, bounded by the in-memory size of each table and everything built on it
+class TableCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.tables = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def get(self, key):
+        with self.lock:
+            table = self.tables.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self.tables.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, key, table):
+        with self.lock:
+            if key in self.tables:
+                self.discard(key)
+            self.tables[key] = table
+            self.sizes[key] = 0
+            self.resize(table)
+
+    # Measure a table again once more is built on it (name index, chart metrics, aggregates), evicting if need be
+    def resize(self, table):
+        with self.lock:
+            key = next((key for key, cached in self.tables.items() if cached is table), None)
+            if key is None:
+                return
+            size = table.nbytes()
+            self.total_bytes += size - self.sizes[key]
+            self.sizes[key] = size
+
+            # Evict least recently used tables, but always keep the newest one
+            while self.total_bytes > self.max_bytes and len(self.tables) > 1:
+                self.discard(next(iter(self.tables)))
+
+    def discard(self, key):
+        with self.lock:
+            del self.tables[key]
+            self.total_bytes -= self.sizes.pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.tables.clear()
+            self.sizes.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        return {
+            "tables": len(self.tables),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+# Parsed tables shared by every chart. A five-league table with its name index and chart metrics takes 2-5 MB
+# (a single league about a fifth of that), so 512 MB holds well over a hundred of them.
+table_cache = TableCache(max_bytes=512 * 1024 * 1024)
+
+# Fold accents and case so "ozil" finds "Mesut Özil"
+def fold_name(name):
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+# Full 90s played for every row, whichever stat table it is
+def full_90s(frame):
+    if ("Playing Time", "90s") in frame.columns:
+        return frame[("Playing Time", "90s")]
+    return frame["90s"]
+
+# Three letter pieces of every word, padded so the starts and ends of names count too
+def name_trigrams(name):
+    grams = set()
+    for token in name.split():
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+# Fewest single letter insertions, deletions and substitutions turning a into b
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+# 0 to 1, how close a query is to any run of as many of a name's words ("bruine" to "kevin de bruyne")
+def name_similarity(query, name):
+    words = name.split()
+    width = len(query.split())
+    parts = {" ".join(words[i:i + width]) for i in range(len(words) - width + 1)} or {name}
+    return max(1 - edit_distance(query, part) / max(len(query), len(part)) for part in parts)
+
+# Player name index for one loaded table (exact, prefix, token and misspelt lookups)
+class NameIndex:
+    def __init__(self, names, nineties):
+        self.folded = [fold_name(name) for name in names]
+        self.nineties = [0.0 if pd.isna(n) else float(n) for n in nineties]
+        self._trigrams = None
+
+        self.exact = {}
+        self.tokens = {}
+        for pos, name in enumerate(self.folded):
+            self.exact.setdefault(name, []).append(pos)
+            for token in name.split():
+                self.tokens.setdefault(token, set()).add(pos)
+
+        self.sorted_names = sorted(zip(self.folded, range(len(self.folded))))
+        self.sorted_tokens = sorted(self.tokens)
+
+    # Approximate memory of the index: the folded strings, and about 64 bytes per entry of each lookup structure
+    # (80 per trigram posting, sets being bigger)
+    def nbytes(self):
+        size = sum(sys.getsizeof(name) for name in self.folded) + sum(sys.getsizeof(token) for token in self.tokens)
+        size += 64 * (4 * len(self.folded) + len(self.tokens) + sum(len(positions) for positions in self.tokens.values()))
+        if self._trigrams is not None:
+            size += 80 * sum(len(positions) for positions in self._trigrams.values())
+        return size
+
+    # Most minutes first, then alphabetical, so the same query always gives the same player
+    def rank(self, positions):
+        return sorted(positions, key=lambda pos: (-self.nineties[pos], self.folded[pos], pos))
+
+    def prefix_matches(self, query):
+        positions = []
+        i = bisect_left(self.sorted_names, (query, -1))
+        while i < len(self.sorted_names) and self.sorted_names[i][0].startswith(query):
+            positions.append(self.sorted_names[i][1])
+            i += 1
+        return positions
+
+    def token_prefix_matches(self, token):
+        positions = set()
+        i = bisect_left(self.sorted_tokens, token)
+        while i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(token):
+            positions |= self.tokens[self.sorted_tokens[i]]
+            i += 1
+        return positions
+
+    # Row positions matching the query, best match first
+    def lookup(self, query):
+        query = fold_name(query)
+        if not query:
+            return []
+
+        # 1. Exact name
+        if query in self.exact:
+            return self.rank(self.exact[query])
+
+        # 2. Every word is one of the player's names ("de bruyne", "silva"), ahead of "silvan widmer"
+        query_tokens = query.split()
+        positions = set.intersection(*(self.tokens.get(token, set()) for token in query_tokens))
+        if positions:
+            return self.rank(positions)
+
+        # 3. Every word starts one of the player's names ("bruy", "kevin de b")
+        positions = set.intersection(*(self.token_prefix_matches(token) for token in query_tokens))
+        if positions:
+            return self.rank(positions)
+
+        # 4. Start of the full name
+        positions = self.prefix_matches(query)
+        if positions:
+            return self.rank(positions)
+
+        # 5. Anywhere in the name, like the old str.contains filter
+        return self.rank(pos for pos, name in enumerate(self.folded) if query in name)
+
+    # Rows of every trigram and how many trigrams each name has, built on the first misspelt lookup
+    @property
+    def trigrams(self):
+        if self._trigrams is None:
+            self._trigrams = {}
+            self.gram_counts = []
+            for pos, name in enumerate(self.folded):
+                grams = name_trigrams(name)
+                self.gram_counts.append(len(grams))
+                for gram in grams:
+                    self._trigrams.setdefault(gram, set()).add(pos)
+        return self._trigrams
+
+    # (position, similarity) of the names closest to a misspelt query ("de bruine", "odegard"), best first.
+    # The names with the most trigrams in common (Dice coefficient) are shortlisted, then ranked by edit distance.
+    def fuzzy(self, query, k=5, shortlist=20, cutoff=0.5):
+        query = fold_name(query)
+        grams = name_trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.trigrams.get(gram, ()))
+        closest = heapq.nlargest(shortlist, shared, key=lambda pos: (2 * shared[pos] / (len(grams) + self.gram_counts[pos]), -pos))
+
+        scored = [(name_similarity(query, self.folded[pos]), pos) for pos in closest]
+        scored = [(score, pos) for score, pos in scored if score >= cutoff]
+        scored.sort(key=lambda match: (-match[0], -self.nineties[match[1]], self.folded[match[1]], match[1]))
+        return [(pos, round(score, 2)) for score, pos in scored[:k]]
+
+# Full 90s a player needs to count in the percentile ranks of the --percentiles radars
+percentile_min_90s = 5
+
+# Percentage of the regulars at or below each value, column by column (the whole table if nobody qualifies yet)
+def regular_percentiles(values, regulars):
+    population = values[regulars] if regulars.any() else values
+    percentiles = np.full(values.shape, np.nan)
+    for i in range(values.shape[1]):
+        ranked = np.sort(population[:, i][~np.isnan(population[:, i])])
+        if len(ranked):
+            percentiles[:, i] = np.searchsorted(ranked, values[:, i], side="right") / len(ranked) * 100
+    percentiles[np.isnan(values)] = np.nan
+    return percentiles
+
+# Index levels players are grouped by for team and league charts
+aggregate_levels = {"team": ["league", "season", "team"], "league": ["league", "season"]}
+
+# Charted columns that are ratios of two others (part, whole, scale), worked out again from the summed parts
+ratio_columns = {
+    ("Total", "Cmp%"): (("Total", "Cmp"), ("Total", "Att"), 100),
+    ("Take-Ons", "Succ%"): (("Take-Ons", "Succ"), ("Take-Ons", "Att"), 100),
+    ("Standard", "G/Sh"): (("Standard", "Gls"), ("Standard", "Sh"), 1),
+}
+
+# A parsed stat table together with the lookups built on top of it
+class StatTable:
+    def __init__(self, frame, stat_type):
+        self.frame = frame
+        self.stat_type = stat_type
+        self._names = None
+        self._columns = {}
+        self._charted = None
+        self._aggregated = {}
+        self.frame_bytes = int(frame.memory_usage(deep=True).sum())
+
+    # Memory held by the frame and everything built on it so far, for the table cache
+    def nbytes(self):
+        size = self.frame_bytes
+        if self._names is not None:
+            size += self._names.nbytes()
+        if self._charted is not None:
+            size += self._charted["values"].nbytes + self._charted["percentiles"].nbytes
+        for aggregated in self._aggregated.values():
+            size += sum(aggregated[part].nbytes for part in ("values", "percentiles", "90s", "teams")) + aggregated["names"].nbytes()
+        return size
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = NameIndex(self.frame.index.get_level_values("player"), full_90s(self.frame))
+            table_cache.resize(self)
+        return self._names
+
+    def find(self, player_name):
+        return self.frame.iloc[self.names.lookup(player_name)]
+
+    # Up to k ranked players for a typed name, with their team and full 90s. Every lookup match scores 1,
+    # when there are none the closest misspellings are offered instead.
+    def candidates(self, player_name, k=5):
+        positions = self.names.lookup(player_name)
+        if positions:
+            matches = [(pos, 1.0) for pos in positions[:k]]
+        else:
+            indexed = self.names._trigrams is not None
+            matches = self.names.fuzzy(player_name, k)
+            if not indexed:
+                table_cache.resize(self)
+        rows = self.frame.index[[pos for pos, score in matches]]
+        return [{
+            "player": player,
+            "team": team,
+            "league": league,
+            "season": season,
+            "90s": self.names.nineties[pos],
+            "score": score,
+        } for (league, season, team, player), (pos, score) in zip(rows, matches)]
+
+    # Positions of the given columns, remembered so repeated extractions skip the column lookup
+    def column_positions(self, columns):
+        columns = tuple(columns)
+        if columns not in self._columns:
+            positions = self.frame.columns.get_indexer(pd.MultiIndex.from_tuples(columns))
+            if (positions < 0).any():
+                raise KeyError(f"columns not in table: {[c for c, p in zip(columns, positions) if p < 0]}")
+            self._columns[columns] = positions
+        return self._columns[columns]
+
+    # Every charted metric of this table for every row (per 90 where the charts use per 90), with percentile
+    # ranks against the table's regulars (percentile_min_90s), so per 90s from a few minutes off the bench do not
+    # take the top of the ranking. Built once, then a player's numbers are a row fetch.
+    def charted(self):
+        if self._charted is None:
+            metrics = charted_metrics(self.stat_type)
+            raw = self.frame.iloc[:, self.column_positions([column for column, per90 in metrics])].to_numpy(dtype=float)
+            nineties = full_90s(self.frame).to_numpy(dtype=float)[:, None]
+            per90 = np.array([per90 for column, per90 in metrics])
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.where(per90, raw / nineties, raw)
+            values[~np.isfinite(values)] = np.nan  # No minutes played, no per 90 value
+
+            percentiles = regular_percentiles(values, nineties[:, 0] >= percentile_min_90s)
+            self._charted = {
+                "index": {metric: i for i, metric in enumerate(metrics)},
+                "values": values,
+                "percentiles": percentiles,
+            }
+            table_cache.resize(self)
+        return self._charted
+
+    # Every charted metric for each team (or league) of this table, from one groupby pass summing the players.
+    # Per 90 metrics are minutes-weighted (summed counts over summed full 90s), ratios are worked out from their
+    # summed parts and season totals stay totals. Percentile ranks are against the other teams (or leagues) here.
+    def aggregated(self, level):
+        if level not in self._aggregated:
+            metrics = charted_metrics(self.stat_type)
+            parts = [part for column, per90 in metrics if column in ratio_columns for part in ratio_columns[column][:2]]
+            columns = list(dict.fromkeys([column for column, per90 in metrics] + parts))
+            raw = self.frame.iloc[:, self.column_positions(columns)].to_numpy(dtype=float)
+            nineties = full_90s(self.frame).to_numpy(dtype=float)[:, None]
+
+            sums = pd.DataFrame(np.hstack([raw, nineties]), index=self.frame.index).groupby(level=aggregate_levels[level]).sum()
+            groups, sums = sums.index, sums.to_numpy()
+            position = {column: i for i, column in enumerate(columns)}
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.column_stack([
+                    sums[:, position[ratio_columns[column][0]]] / sums[:, position[ratio_columns[column][1]]] * ratio_columns[column][2] if column in ratio_columns
+                    else sums[:, position[column]] / sums[:, -1] if per90
+                    else sums[:, position[column]]
+                    for column, per90 in metrics
+                ])
+            values[~np.isfinite(values)] = np.nan
+
+            teams = pd.Series(1, index=self.frame.index.droplevel("player").unique()).groupby(level=aggregate_levels[level]).size()
+            self._aggregated[level] = {
+                "index": {metric: i for i, metric in enumerate(metrics)},
+                "groups": groups,
+                "names": NameIndex(groups.get_level_values(level), sums[:, -1]),
+                "teams": teams.reindex(groups).to_numpy(),
+                "90s": sums[:, -1],
+                "values": values,
+                "percentiles": pd.DataFrame(values).rank(pct=True).to_numpy() * 100,
+            }
+            table_cache.resize(self)
+        return self._aggregated[level]
+
+# Parsed tables saved as Parquet next to soccerdata's own cache
+snapshot_dir = Path.home() / "soccerdata" / "data" / "Chippy"
+
+# soccerdata's cached pages a table is parsed from, one per league and season of the reader
+def source_pages(fbref, stat_type):
+    return [Path(fbref.data_dir) / f"players_{league}_{season}_{stat_type}.html" for league in fbref.leagues for season in fbref.seasons]
+
+# soccerdata re-downloads cached pages older than SOCCERDATA_MAXAGE days (no limit when unset)
+def soccerdata_max_age():
+    max_age = os.environ.get("SOCCERDATA_MAXAGE")
+    return int(max_age) * 86400 if max_age is not None else None
+
+# Fingerprint of the soccerdata HTML pages a table is parsed from, changes whenever they are re-downloaded.
+# None when soccerdata would not use its cache for them (no_cache or SOCCERDATA_NOCACHE, a missing page or one
+# past its max age), so the table is read through soccerdata and its own refresh rules apply.
+def source_fingerprint(fbref, stat_type):
+    if getattr(fbref, "data_dir", None) is None or getattr(fbref, "no_cache", False):
+        return None
+    max_age = soccerdata_max_age()
+    digest = hashlib.sha1()
+    for page in source_pages(fbref, stat_type):
+        if not page.exists():
+            return None
+        stat = page.stat()
+        if max_age is not None and time.time() - stat.st_mtime > max_age:
+            return None
+        digest.update(f"{page.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+# Size of the cached pages a table is parsed from
+def source_bytes(fbref, stat_type):
+    if getattr(fbref, "data_dir", None) is None:
+        return 0
+    return sum(page.stat().st_size for page in source_pages(fbref, stat_type) if page.exists())
+
+def snapshot_prefix(key):
+    return "_".join(re.sub(r"[^A-Za-z0-9]+", "-", part) for part in key) + "_"
+
+# Memory-map a saved table if its source pages have not changed since it was written
+def load_snapshot(key, fingerprint):
+    if fingerprint is None:
+        return None
+    path = snapshot_dir / f"{snapshot_prefix(key)}{fingerprint}.parquet"
+    if not path.exists():
+        return None
+    try:
+        with timed("snapshot"):
+            frame = pd.read_parquet(path, memory_map=True)
+        counted("bytes_read", path.stat().st_size)
+        return frame
+    except Exception:  # Corrupt or unreadable snapshot (or no pyarrow), parse from HTML instead
+        return None
+
+# Save a parsed table, replacing snapshots of older versions of its source pages
+def save_snapshot(key, fingerprint, frame):
+    if fingerprint is None:
+        return
+    prefix = snapshot_prefix(key)
+    try:
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        for stale in snapshot_dir.glob(prefix + "?" * len(fingerprint) + ".parquet"):
+            stale.unlink()
+        frame.to_parquet(snapshot_dir / f"{prefix}{fingerprint}.parquet")
+    except Exception:  # Snapshots are only a speed-up, never fail a chart because of one
+        pass
+
+# Tables being loaded right now, so a chart waits for a background load instead of starting its own
+table_lock = threading.Lock()
+table_loads = {}
+
+# soccerdata spaces out its FBref requests by sleeping after each one in the calling thread, on one shared
+# session, so reads from several threads would all go out at once and FBref blocks IPs that go over its rate
+# limit. Prefetch threads, the report and the service's request threads take turns on anything that downloads.
+scrape_lock = threading.Lock()
+
+# Fetch a whole league-season stat table, parsing it only once
+def read_stat_table(fbref, stat_type):
+    key = (",".join(fbref.leagues), ",".join(str(season) for season in fbref.seasons), stat_type)
+    with table_lock:
+        table = table_cache.get(key)
+        if table is not None:
+            counted("table_hits")
+            return table
+        counted("table_misses")
+        loading = table_loads.get(key)
+        if loading is None:
+            loading = table_loads[key] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        with timed("wait"):
+            return loading.result()
+
+    try:
+        fingerprint = source_fingerprint(fbref, stat_type)
+        frame = load_snapshot(key, fingerprint)
+        if frame is None:
+            # Pages soccerdata has to download are fetched one reader at a time, cached pages parse in parallel
+            downloads = fingerprint is None and not isinstance(fbref, LocalFBref)
+            with timed("wait"):
+                if downloads:
+                    scrape_lock.acquire()
+            try:
+                with timed("parse"):
+                    frame = fbref.read_player_season_stats(stat_type=stat_type)
+            finally:
+                if downloads:
+                    scrape_lock.release()
+            counted("bytes_read", source_bytes(fbref, stat_type))
+            save_snapshot(key, source_fingerprint(fbref, stat_type), frame)  # Pages may have just been downloaded
+        table = StatTable(frame, stat_type)
+        with table_lock:
+            table_cache.put(key, table)
+        loading.set_result(table)
+        return table
+    except Exception as e:
+        loading.set_exception(e)
+        raise
+    finally:
+        with table_lock:
+            del table_loads[key]
+
+# Every stat table the charts read
+stat_types = ["standard", "shooting", "passing", "goal_shot_creation", "possession", "passing_types"]
+
+prefetch_pool = None
+
+# Load a table and build its name index and chart metrics, for the prefetch threads
+def warm_table(fbref, stat_type):
+    table = read_stat_table(fbref, stat_type)
+    table.names
+    table.charted()
+
+# Start loading every stat table of a league-season in the background, so the charts find them ready. Snapshots,
+# local files, cached pages, name indexes and chart metrics load in parallel, FBref downloads one at a time.
+def prefetch_tables(league, season):
+    global prefetch_pool
+    if prefetch_pool is None:
+        prefetch_pool = ThreadPoolExecutor(max_workers=len(stat_types), thread_name_prefix="chippy-prefetch")
+    fbref = get_fbref(league, season)
+    return [prefetch_pool.submit(warm_table, fbref, stat_type) for stat_type in stat_types]
+
+# Fetch player stats, best match first
 def read_player_stats(fbref, stat_type, player_name):
-    player_season_stats = fbref.read_player_season_stats(stat_type=stat_type)
-    return player_season_stats[player_season_stats.index.get_level_values("player").str.contains(player_name, case=False, na=False)]
+    return read_stat_table(fbref, stat_type).find(player_name)
 
 # Get player
 def get_player(p_name, p_league, p_year):
     try:
-        fbref = sd.FBref(leagues=p_league, seasons=p_year)
+        fbref = get_fbref(p_league, p_year)
         player = read_player_stats(fbref, "standard", p_name)
 
         try:
@@ -83,870 +843,1168 @@ def get_player(p_name, p_league, p_year):
 
     return player_name
 
-# Compare Stats
-def compare_statistics(statistic, p1_name, p1_year, p1_league, p2_name, p2_year, p2_league):
-    stat_functions = {
-        "standard": standard,                               # 1 Standard
-        "shooting": shooting,                               # 2 Shooting
-        "final_ball": final_ball,                           # 3 Final Ball
-        "goal_shot_creation": goal_and_shot,                # 4 Goal and Shot Creation
-        "playmaking": playmaking,                           # 5 Playmaking
-        "possession": possession,                           # 6 Possession
-        "pass_types": pass_types,                           # 7 Pass Types
-        "passing_distance": passing_distance,               # 8 Passing Distance
+# Ranked players of a league-season for a typed name, with team and full 90s
+def find_players(p_name, p_league, p_year, k=5):
+    return read_stat_table(get_fbref(p_league or big_five_leagues, p_year), "standard").candidates(p_name, k)
+
+# Resolve a typed name to one player row for the menu, asking which one when several players match or the
+# name looks misspelt. The loaded table is reused, so picking from the list costs no reload. With no league
+# the name is searched across all five leagues at once, from one read of their standard tables.
+def pick_player(p_name, p_league, p_year):
+    try:
+        candidates = find_players(p_name, p_league, p_year)
+    except IndexError:
+        return None
+    if not candidates:
+        return None
+    if candidates[0]["score"] == 1.0 and len({(candidate["player"], candidate["league"]) for candidate in candidates}) == 1:
+        return candidates[0]
+
+    print("Chippy: Several players match, which one?" if candidates[0]["score"] == 1.0 else "Chippy: Did you mean...")
+    for i, candidate in enumerate(candidates, start=1):
+        where = candidate["team"] if p_league else f"{candidate['team']}, {candidate['league']}"
+        print(f"\t [{i}] {candidate['player']} ({where}) - Full 90s: {candidate['90s']}")
+    choice = input("Chippy: Enter a number (or nothing for 1): ")
+    if choice == "":
+        return candidates[0]
+    if choice.isdigit() and 1 <= int(choice) <= len(candidates):
+        return candidates[int(choice) - 1]
+    return None
+
+# Name, team, season and full 90s of the best matching row
+def player_info(player_season_stats):
+    return {
+        "name": player_season_stats.index.get_level_values("player")[0],
+        "team": player_season_stats.index.get_level_values("team")[0],
+        "season": player_season_stats.index.get_level_values("season")[0],
+        "90s": float(full_90s(player_season_stats).values[0]),
     }
 
-    if statistic in stat_functions:
-        stat_function = stat_functions[statistic]
-        fbref1 = sd.FBref(leagues = p1_league, seasons = p1_year)
-        fbref2 = sd.FBref(leagues = p2_league, seasons = p2_year)
-        stat_function(fbref1, p1_name, fbref2, p2_name)
-    else:
+# Compare any number of (name, league, season) players on one chart, shown in a window or saved to output (PNG, SVG, PDF...)
+def compare_players(statistic, players, output=None, percentiles=False):
+    if statistic not in chart_specs:
         print("Invalid statistic: ", statistic)
-
-
-
-# 1 Standard
-def standard(fbref1, p1_name, fbref2, p2_name):
-    player1_season_stats = read_player_stats(fbref1, "standard", p1_name)
-    player2_season_stats = read_player_stats(fbref2, "standard", p2_name)
-
-    player1_name = player1_season_stats.index.get_level_values("player")[0]
-    player1_team = player1_season_stats.index.get_level_values("team")[0]
-    player1_season = player1_season_stats.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats.index.get_level_values("player")[0]
-    player2_team = player2_season_stats.index.get_level_values("team")[0]
-    player2_season = player2_season_stats.index.get_level_values("season")[0]
-
-    p1_90s = player1_season_stats["Playing Time"]["90s"].values[0]
-    p2_90s = player2_season_stats["Playing Time"]["90s"].values[0]
-
-    p1_color = 'red'
-    p2_color = 'blue'
-
-    # Standard stat categories
-    standard_categories = ['Goals', 'xG', 'Assists', 'xAG', 'Progressive Carries', 'Progressive Passes', '']
-
-    # Number of categories
-    num_categories = len(standard_categories)
-
-    p1_standard_stats = [
-        round(player1_season_stats["Performance"]["Gls"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Expected"]["xG"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Performance"]["Ast"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Expected"]["xAG"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Progression"]["PrgC"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Progression"]["PrgP"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Performance"]["Gls"].values[0] / p1_90s, 2),
-    ]
-
-    p2_standard_stats = [
-        round(player2_season_stats["Performance"]["Gls"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Expected"]["xG"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Performance"]["Ast"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Expected"]["xAG"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Progression"]["PrgC"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Progression"]["PrgP"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Performance"]["Gls"].values[0] / p2_90s, 2),
-    ]
-
-    p1_normalized = []
-    p2_normalized = []
-
-    for p1_stat, p2_stat in zip(p1_standard_stats, p2_standard_stats):
-        max_value = max(p1_stat, p2_stat)
-        p1_normalized.append(round(p1_stat/max_value/1.1, 2))
-        p2_normalized.append(round(p2_stat/max_value/1.1, 2))
-
-    # Create a list of angles for the radar chart
-    angles = np.flip(np.linspace(0, 2 * np.pi, num_categories, endpoint=True))
-
-    # Make the plot circular
-    fig = plt.figure(figsize=(10, 6))
-    ax = fig.add_subplot(111, polar=True)
-
-    # Plot the data for Player 1
-    line1, = ax.plot(angles, p1_normalized, marker='o', label=player1_name, color=p1_color)
-    ax.fill(angles, p1_normalized, alpha=0.25, color=p1_color)
-
-    # Plot the data for Player 2
-    line2, = ax.plot(angles, p2_normalized, marker='o', label=player2_name, color=p2_color)
-    ax.fill(angles, p2_normalized, alpha=0.25, color=p2_color)
-
-    # Set the angle labels
-    ax.set_xticks(angles)
-    ax.set_xticklabels(standard_categories)
-
-    # Set y-axis labels
-    ax.set_rlabel_position(0)
-    plt.yticks([0.2, 0.4, 0.6, 0.8], ["0.2", "0.4", "0.6", "0.8"], color="grey", size=10)
-    plt.ylim(0, 1)
-    
-    # Add numeric labels for Player 1
-    for angle, norm_stat, stat in zip(angles, p1_normalized, p1_standard_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line1.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Add numeric labels for Player 2
-    for angle, norm_stat, stat in zip(angles, p2_normalized, p2_standard_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line2.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    custom_legend = [
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_name} ({season_display(player1_season)})", markerfacecolor=p1_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p1_90s}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_name} ({season_display(player2_season)})", markerfacecolor=p2_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p2_90s}"),
-    ]
-
-    plt.legend(handles=custom_legend, loc='upper right', bbox_to_anchor=(1.55, 1.05))
-    ax.set_title(player1_name + " (" + season_display(player1_season) + ") vs " + player2_name + " (" + season_display(player2_season) + "): Standard Stats (Per 90)", y=1.075)
-
-    plt.show()
-
-# 2 Shooting
-def shooting(fbref1, p1_name, fbref2, p2_name):
-    player1_season_stats = read_player_stats(fbref1, "shooting", p1_name)
-    player2_season_stats = read_player_stats(fbref2, "shooting", p2_name)
-
-    player1_name = player1_season_stats.index.get_level_values("player")[0]
-    player1_team = player1_season_stats.index.get_level_values("team")[0]
-    player1_season = player1_season_stats.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats.index.get_level_values("player")[0]
-    player2_team = player2_season_stats.index.get_level_values("team")[0]
-    player2_season = player2_season_stats.index.get_level_values("season")[0]
-
-    p1_90s = player1_season_stats["90s"].values[0]
-    p2_90s = player2_season_stats["90s"].values[0]
-
-    p1_color = 'red'
-    p2_color = 'blue'
-
-    # Playmaking stat categories
-    shooting_categories = ['Goals (p90)', 'xG (p90)', 'Shots (p90)', 'Shots on Target (p90)', 'Goals per Shot', '']
-
-    # Number of categories
-    num_categories = len(shooting_categories)
-
-    p1_shooting_stats = [
-        round(player1_season_stats["Standard"]["Gls"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Expected"]["xG"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Standard"]["Sh"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Standard"]["SoT"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Standard"]["G/Sh"].values[0], 2),
-        round(player1_season_stats["Standard"]["Gls"].values[0] / p1_90s, 2),
-    ]
-
-    p2_shooting_stats = [
-        round(player2_season_stats["Standard"]["Gls"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Expected"]["xG"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Standard"]["Sh"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Standard"]["SoT"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Standard"]["G/Sh"].values[0], 2),
-        round(player2_season_stats["Standard"]["Gls"].values[0] / p2_90s, 2),
-    ]
-
-    p1_normalized = []
-    p2_normalized = []
-
-    for p1_stat, p2_stat in zip(p1_shooting_stats, p2_shooting_stats):
-        if (p1_stat == p1_shooting_stats[len(p1_shooting_stats)-1]):
-                max_value = max(p1_stat, p2_stat)
-        max_value = max(p1_stat, p2_stat)
-        p1_normalized.append(round(p1_stat/max_value/1.1, 2))
-        p2_normalized.append(round(p2_stat/max_value/1.1, 2))
-
-    # Create a list of angles for the radar chart
-    angles = np.flip(np.linspace(0, 2 * np.pi, num_categories, endpoint=True))
-
-    # Make the plot circular
-    fig = plt.figure(figsize=(10, 6))
-    ax = fig.add_subplot(111, polar=True)
-
-    # Plot the data for Player 1
-    line1, = ax.plot(angles, p1_normalized, marker='o', label=player1_name, color=p1_color)
-    ax.fill(angles, p1_normalized, alpha=0.25, color=p1_color)
-
-    # Plot the data for Player 2
-    line2, = ax.plot(angles, p2_normalized, marker='o', label=player2_name, color=p2_color)
-    ax.fill(angles, p2_normalized, alpha=0.25, color=p2_color)
-
-    # Set the angle labels
-    ax.set_xticks(angles)
-    ax.set_xticklabels(shooting_categories)
-
-    # Set y-axis labels
-    ax.set_rlabel_position(0)
-    plt.yticks([0.2, 0.4, 0.6, 0.8], ["0.2", "0.4", "0.6", "0.8"], color="grey", size=10)
-    plt.ylim(0, 1)
-    
-    # Add numeric labels for Player 1
-    for angle, norm_stat, stat in zip(angles, p1_normalized, p1_shooting_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line1.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Add numeric labels for Player 2
-    for angle, norm_stat, stat in zip(angles, p2_normalized, p2_shooting_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line2.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    custom_legend = [
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_name} ({season_display(player1_season)})", markerfacecolor=p1_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p1_90s}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_name} ({season_display(player2_season)})", markerfacecolor=p2_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p2_90s}"),
-    ]
-
-    plt.legend(handles=custom_legend, loc='upper right', bbox_to_anchor=(1.5, 1.05))
-    ax.set_title(player1_name + " (" + season_display(player1_season) + ") vs " + player2_name + " (" + season_display(player2_season) + "): Shooting Comparision", y=1.075)
-
-    plt.show()
-
-# 3 Final Ball
-def final_ball(fbref1, p1_name, fbref2, p2_name):
-    player1_season_stats = read_player_stats(fbref1, "passing", p1_name)
-    player2_season_stats = read_player_stats(fbref2, "passing", p2_name)
-
-    player1_name = player1_season_stats.index.get_level_values("player")[0]
-    player1_team = player1_season_stats.index.get_level_values("team")[0]
-    player1_season = player1_season_stats.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats.index.get_level_values("player")[0]
-    player2_team = player2_season_stats.index.get_level_values("team")[0]
-    player2_season = player2_season_stats.index.get_level_values("season")[0]
-
-    p1_90s = player1_season_stats["90s"].values[0]
-    p2_90s = player2_season_stats["90s"].values[0]
-
-    p1_color = 'red'
-    p2_color = 'blue'
-
-    # Final Ball stat categories
-    final_ball_categories = ['Assists', 'xAG', 'xA', 'Key Passes', 'Passes into Penalty Area', 'Crosses in Penalty Area', '']
-
-    # Number of categories
-    num_categories = len(final_ball_categories)
-
-    p1_playmaking_stats = [
-        round(player1_season_stats["Ast"].values[0] / p1_90s, 2),
-        round(player1_season_stats["xAG"].values[0] / p1_90s, 2),
-        round(player1_season_stats["xA"].values[0] / p1_90s, 2),
-        round(player1_season_stats["KP"].values[0] / p1_90s, 2),
-        round(player1_season_stats["PPA"].values[0] / p1_90s, 2),
-        round(player1_season_stats["CrsPA"].values[0] / p1_90s, 2),
-        round(player1_season_stats["Ast"].values[0] / p1_90s, 2),
-    ]
-
-    p2_playmaking_stats = [
-        round(player2_season_stats["Ast"].values[0] / p2_90s, 2),
-        round(player2_season_stats["xAG"].values[0] / p2_90s, 2),
-        round(player2_season_stats["xA"].values[0] / p2_90s, 2),
-        round(player2_season_stats["KP"].values[0] / p2_90s, 2),
-        round(player2_season_stats["PPA"].values[0] / p2_90s, 2),
-        round(player2_season_stats["CrsPA"].values[0] / p2_90s, 2),
-        round(player2_season_stats["Ast"].values[0] / p2_90s, 2),
-    ]
-
-    p1_normalized = []
-    p2_normalized = []
-    
-    for p1_stat, p2_stat in zip(p1_playmaking_stats, p2_playmaking_stats):
-        max_value = max(p1_stat, p2_stat)
-        p1_normalized.append(round(p1_stat/max_value/1.1, 2))
-        p2_normalized.append(round(p2_stat/max_value/1.1, 2))
-
-    
-    # Create a list of angles for the radar chart
-    angles = np.flip(np.linspace(0, 2 * np.pi, num_categories, endpoint=True))
-
-    # Make the plot circular
-    fig = plt.figure(figsize=(10, 6))
-    ax = fig.add_subplot(111, polar=True)
-
-    # Plot the data for Player 1
-    line1, = ax.plot(angles, p1_normalized, marker='o', label=player1_name, color=p1_color)
-    ax.fill(angles, p1_normalized, alpha=0.25, color=p1_color)
-
-    # Plot the data for Player 2
-    line2, = ax.plot(angles, p2_normalized, marker='o', label=player2_name, color=p2_color)
-    ax.fill(angles, p2_normalized, alpha=0.25, color=p2_color)
-
-    # Set the angle labels
-    ax.set_xticks(angles)
-    ax.set_xticklabels(final_ball_categories)
-
-    # Set y-axis labels
-    ax.set_rlabel_position(0)
-    plt.yticks([0.2, 0.4, 0.6, 0.8], ["0.2", "0.4", "0.6", "0.8"], color="grey", size=10)
-    plt.ylim(0, 1)
-
-    # Add numeric labels for Player 1
-    for angle, norm_stat, stat in zip(angles, p1_normalized, p1_playmaking_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line1.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Add numeric labels for Player 2
-    for angle, norm_stat, stat in zip(angles, p2_normalized, p2_playmaking_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line2.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Create a custom legend
-    custom_legend = [
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_name} ({season_display(player1_season)})", markerfacecolor=p1_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p1_90s}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_name} ({season_display(player2_season)})", markerfacecolor=p2_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p2_90s}"),
-    ]
-
-    plt.legend(handles=custom_legend, loc='upper right', bbox_to_anchor=(1.5, 1.05))
-    ax.set_title(player1_name + " (" + season_display(player1_season) + ") vs " + player2_name + " (" + season_display(player2_season) + "): Final Ball Comparison (Per 90)", y=1.075)
-
-    plt.show()
-
-# 4 Goal and Shot Creation
-def goal_and_shot(fbref1, p1_name, fbref2, p2_name):
-    player1_season_stats = read_player_stats(fbref1, "goal_shot_creation", p1_name)
-    player2_season_stats = read_player_stats(fbref2, "goal_shot_creation", p2_name)
-
-    player1_name = player1_season_stats.index.get_level_values("player")[0]
-    player1_team = player1_season_stats.index.get_level_values("team")[0]
-    player1_season = player1_season_stats.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats.index.get_level_values("player")[0]
-    player2_team = player2_season_stats.index.get_level_values("team")[0] 
-    player2_season = player2_season_stats.index.get_level_values("season")[0]
-
-    p1_90s = player1_season_stats["90s"].values[0]
-    p2_90s = player2_season_stats["90s"].values[0]
-
-    p1_color = 'red'
-    p2_color = 'blue'
-
-    # Goal and Shot stat categories
-    goalshot_categories = ['SCA (Live)', 'SCA (Dead)', 'SCA (Take-Ons)', 'GCA (Live)', 'GCA (Dead)', 'GCA (Take-Ons)', '']
-
-    # Number of categories
-    num_categories = len(goalshot_categories)
-
-    p1_goalshot_stats = [
-        round(player1_season_stats["SCA Types"]["PassLive"].values[0] / p1_90s, 2),
-        round(player1_season_stats["SCA Types"]["PassDead"].values[0] / p1_90s, 2),
-        round(player1_season_stats["SCA Types"]["TO"].values[0] / p1_90s, 2),
-        round(player1_season_stats["GCA Types"]["PassLive"].values[0] / p1_90s, 2),
-        round(player1_season_stats["GCA Types"]["PassDead"].values[0] / p1_90s, 2),
-        round(player1_season_stats["GCA Types"]["TO"].values[0] / p1_90s, 2),
-        round(player1_season_stats["SCA Types"]["PassLive"].values[0] / p1_90s, 2),
-    ]
-
-    p2_goalshot_stats = [
-        round(player2_season_stats["SCA Types"]["PassLive"].values[0] / p1_90s, 2),
-        round(player2_season_stats["SCA Types"]["PassDead"].values[0] / p1_90s, 2),
-        round(player2_season_stats["SCA Types"]["TO"].values[0] / p1_90s, 2),
-        round(player2_season_stats["GCA Types"]["PassLive"].values[0] / p1_90s, 2),
-        round(player2_season_stats["GCA Types"]["PassDead"].values[0] / p1_90s, 2),
-        round(player2_season_stats["GCA Types"]["TO"].values[0] / p1_90s, 2),
-        round(player2_season_stats["SCA Types"]["PassLive"].values[0] / p1_90s, 2),
-    ]
-
-    p1_normalized = []
-    p2_normalized = []
-    
-    for p1_stat, p2_stat in zip(p1_goalshot_stats, p2_goalshot_stats):
-        max_value = max(p1_stat, p2_stat)
-        p1_normalized.append(round(p1_stat/max_value/1.1, 2))
-        p2_normalized.append(round(p2_stat/max_value/1.1, 2))
-    
-    # Create a list of angles for the radar chart
-    angles = np.flip(np.linspace(0, 2 * pi, num_categories, endpoint=True))
-
-    # Make the plot circular
-    fig = plt.figure(figsize=(10, 6))
-    ax = fig.add_subplot(111, polar=True)
-
-    # Plot the data for Player 1
-    line1, = ax.plot(angles, p1_normalized, marker='o', label=player1_name, color=p1_color)
-    ax.fill(angles, p1_normalized, alpha=0.25, color=p1_color)
-
-    # Plot the data for Player 2
-    line2, = ax.plot(angles, p2_normalized, marker='o', label=player2_name, color=p2_color)
-    ax.fill(angles, p2_normalized, alpha=0.25, color=p2_color)
-
-    # Set the angle labels
-    ax.set_xticks(angles)
-    ax.set_xticklabels(goalshot_categories)
-
-    # Set y-axis labels
-    ax.set_rlabel_position(0)
-    plt.yticks([0.2, 0.4, 0.6, 0.8], ["0.2", "0.4", "0.6", "0.8"], color="grey", size=10)
-    plt.ylim(0, 1)
-
-    # Add numeric labels for Player 1
-    for angle, norm_stat, stat in zip(angles, p1_normalized, p1_goalshot_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line1.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Add numeric labels for Player 2
-    for angle, norm_stat, stat in zip(angles, p2_normalized, p2_goalshot_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line2.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Create a custom legend
-    custom_legend = [
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_name} ({season_display(player1_season)})", markerfacecolor=p1_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p1_90s}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_name} ({season_display(player2_season)})", markerfacecolor=p2_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p2_90s}"),
+        return
+
+    # Each (league, season) reader and table is loaded once, however many players share it
+    with traced(f"{statistic}: " + " vs ".join(f"{name} {season}" for name, league, season in players)):
+        spec = chart_specs[statistic]
+        extracted = [extract_player(spec, get_fbref(league, season), name) for name, league, season in players]
+        with timed("draw"):
+            fig = draw_chart(statistic, extracted, percentiles)
+        if output:
+            with timed("save"):
+                fig.savefig(output, bbox_inches="tight")
+            plt.close(fig)
+    if not output:
+        plt.show()
+
+# Every chart for any number of (name, league, season) players on one figure, shown in a window or saved to output.
+# Each league-season's six tables are loaded once, in parallel, and each player is looked up once.
+def player_report(players, output=None, percentiles=False):
+    with traced("full report: " + " vs ".join(f"{name} {season}" for name, league, season in players)):
+        with timed("load"):
+            for league, season in dict.fromkeys((league, season) for name, league, season in players):
+                for future in prefetch_tables(league, season):
+                    future.result()
+
+        charts = {statistic: [] for statistic in chart_specs}
+        for name, league, season in players:
+            fbref = get_fbref(league, season)
+            table = read_stat_table(fbref, "standard")
+            with timed("lookup"):
+                positions = table.names.lookup(name)
+            if not positions:
+                raise LookupError(f"'{name}' not found in standard stats")
+            key = table.frame.index[positions[0]]
+            for statistic, spec in chart_specs.items():
+                charts[statistic].append(extract_row(spec, fbref, key))
+
+        with timed("draw"):
+            fig = draw_report(charts, percentiles)
+        if output:
+            with timed("save"):
+                fig.savefig(output, bbox_inches="tight")
+            plt.close(fig)
+    if not output:
+        plt.show()
+
+# Compare any number of (team, league, season) teams on one chart, shown in a window or saved to output. Percentiles
+# are against the other teams of the same league-season.
+def compare_teams(statistic, teams, output=None, percentiles=False):
+    compare_groups(statistic, "team", [(get_fbref(league, season), team, season) for team, league, season in teams], output, percentiles)
+
+# Compare any number of (league, season) leagues on one chart, shown in a window or saved to output. Each season's
+# five leagues are read together, so percentiles are against the other big five leagues.
+def compare_leagues(statistic, leagues, output=None, percentiles=False):
+    compare_groups(statistic, "league", [(get_fbref(big_five_leagues, season), league, season) for league, season in leagues], output, percentiles)
+
+def compare_groups(statistic, level, groups, output=None, percentiles=False):
+    if statistic not in chart_specs:
+        print("Invalid statistic: ", statistic)
+        return
+
+    with traced(f"{statistic}: " + " vs ".join(f"{name} {season}" for fbref, name, season in groups)):
+        spec = chart_specs[statistic]
+        extracted = [extract_group(spec, fbref, level, name) for fbref, name, season in groups]
+        with timed("draw"):
+            fig = draw_chart(statistic, extracted, percentiles)
+        if output:
+            with timed("save"):
+                fig.savefig(output, bbox_inches="tight")
+            plt.close(fig)
+    if not output:
+        plt.show()
+
+# Compare Stats, shown in a window or saved to output (PNG, SVG, PDF...)
+def compare_statistics(statistic, p1_name, p1_year, p1_league, p2_name, p2_year, p2_league, output=None):
+    compare_players(statistic, [(p1_name, p1_league, p1_year), (p2_name, p2_league, p2_year)], output)
+
+
+
+# Chart specifications: every metric is (stat_type, column, per 90, label)
+chart_specs = {
+    # 1 Standard
+    "standard": {
+        "kind": "radar",
+        "title": "Standard Stats (Per 90)",
+        "legend_anchor": (1.55, 1.05),
+        "metrics": [
+            ("standard", ("Performance", "Gls"), True, "Goals"),
+            ("standard", ("Expected", "xG"), True, "xG"),
+            ("standard", ("Performance", "Ast"), True, "Assists"),
+            ("standard", ("Expected", "xAG"), True, "xAG"),
+            ("standard", ("Progression", "PrgC"), True, "Progressive Carries"),
+            ("standard", ("Progression", "PrgP"), True, "Progressive Passes"),
+        ],
+    },
+    # 2 Shooting
+    "shooting": {
+        "kind": "radar",
+        "title": "Shooting Comparision",
+        "legend_anchor": (1.5, 1.05),
+        "metrics": [
+            ("shooting", ("Standard", "Gls"), True, "Goals (p90)"),
+            ("shooting", ("Expected", "xG"), True, "xG (p90)"),
+            ("shooting", ("Standard", "Sh"), True, "Shots (p90)"),
+            ("shooting", ("Standard", "SoT"), True, "Shots on Target (p90)"),
+            ("shooting", ("Standard", "G/Sh"), False, "Goals per Shot"),
+        ],
+    },
+    # 3 Final Ball
+    "final_ball": {
+        "kind": "radar",
+        "title": "Final Ball Comparison (Per 90)",
+        "legend_anchor": (1.5, 1.05),
+        "metrics": [
+            ("passing", ("Ast", ""), True, "Assists"),
+            ("passing", ("xAG", ""), True, "xAG"),
+            ("passing", ("xA", ""), True, "xA"),
+            ("passing", ("KP", ""), True, "Key Passes"),
+            ("passing", ("PPA", ""), True, "Passes into Penalty Area"),
+            ("passing", ("CrsPA", ""), True, "Crosses in Penalty Area"),
+        ],
+    },
+    # 4 Goal and Shot Creation
+    "goal_shot_creation": {
+        "kind": "radar",
+        "title": "SCA and GCA Comparison (Per 90)",
+        "legend_anchor": (1.5, 1.05),
+        "metrics": [
+            ("goal_shot_creation", ("SCA Types", "PassLive"), True, "SCA (Live)"),
+            ("goal_shot_creation", ("SCA Types", "PassDead"), True, "SCA (Dead)"),
+            ("goal_shot_creation", ("SCA Types", "TO"), True, "SCA (Take-Ons)"),
+            ("goal_shot_creation", ("GCA Types", "PassLive"), True, "GCA (Live)"),
+            ("goal_shot_creation", ("GCA Types", "PassDead"), True, "GCA (Dead)"),
+            ("goal_shot_creation", ("GCA Types", "TO"), True, "GCA (Take-Ons)"),
+        ],
+    },
+    # 5 Playmaking
+    "playmaking": {
+        "kind": "radar",
+        "title": "Playmaking Comparison (Per 90)",
+        "legend_anchor": (1.5, 1.05),
+        "metrics": [
+            ("passing", ("Total", "Cmp"), True, "Total Passes"),
+            ("passing", ("Total", "Cmp%"), False, "Pass Accuracy (%)"),
+            ("passing", ("KP", ""), True, "Key Passes"),
+            ("passing", ("PrgP", ""), True, "Progressive Passes"),
+            ("passing", ("1/3", ""), True, "Passes into Final Third"),
+            ("passing", ("PPA", ""), True, "Passes into Penalty Area"),
+            ("possession", ("Carries", "PrgC"), True, "Progressive Carries"),
+            ("possession", ("Carries", "1/3"), True, "Carries into Final Third"),
+            ("possession", ("Carries", "CPA"), True, "Carries into Penalty Area"),
+            ("possession", ("Take-Ons", "Succ"), True, "Take Ons"),
+            ("possession", ("Take-Ons", "Succ%"), False, "Take Ons %"),
+        ],
+    },
+    # 6 Possession
+    "possession": {
+        "kind": "pie",
+        "title": "Total Touches",
+        "legend_title": "Touches",
+        "title_y": None,
+        "colors": [["red"] * 5, ["blue"] * 5],
+        "alphas": [0.2, 0.4, 0.6, 0.8, 1.0],
+        "metrics": [
+            ("possession", ("Touches", "Def Pen"), False, "Def Pen"),
+            ("possession", ("Touches", "Def 3rd"), False, "Def 3rd"),
+            ("possession", ("Touches", "Mid 3rd"), False, "Mid 3rd"),
+            ("possession", ("Touches", "Att 3rd"), False, "Att 3rd"),
+            ("possession", ("Touches", "Att Pen"), False, "Att Pen"),
+        ],
+    },
+    # 7 Pass Types
+    "pass_types": {
+        "kind": "pie",
+        "title": "Pass Types",
+        "legend_title": "Pass Types",
+        "title_y": 1.075,
+        "colors": [["darkred", "red", "darkorange", "orange"], ["darkblue", "blue", "lightskyblue", "cornflowerblue"]],
+        "alphas": [0.8] * 4,
+        "remainder": True,  # The first slice is what is left of it once the other slices are taken out
+        "metrics": [
+            ("passing_types", ("Pass Types", "Live"), False, "Live"),
+            ("passing_types", ("Pass Types", "TB"), False, "Through Balls"),
+            ("passing_types", ("Pass Types", "Crs"), False, "Crosses"),
+            ("passing_types", ("Pass Types", "Sw"), False, "Switches"),
+        ],
+    },
+    # 8 Passing Distance
+    "passing_distance": {
+        "kind": "bars",
+        "title": "Pass Distance Comparison",
+        "decimals": 0,
+        "metrics": [
+            ("passing", ("PrgP", ""), True, "Progressive"),
+            ("passing", ("Total", "Cmp"), True, "Completed"),
+            ("passing", ("Total", "Att"), True, "Attempted"),
+            ("passing", ("Short", "Cmp"), True, "Short (5-15yds)"),
+            ("passing", ("Short", "Att"), True, "Short (5-15yds)"),
+            ("passing", ("Medium", "Cmp"), True, "Medium (15-30yds)"),
+            ("passing", ("Medium", "Att"), True, "Medium (15-30yds)"),
+            ("passing", ("Long", "Cmp"), True, "Long (>30yds)"),
+            ("passing", ("Long", "Att"), True, "Long (>30yds)"),
+        ],
+    },
+}
+
+# Row position of the same player in another stat table of the same league-season
+def row_position(frame, key):
+    position = frame.index.get_loc(key)
+    if isinstance(position, slice):
+        return position.start
+    if not isinstance(position, (int, np.integer)):
+        return int(np.flatnonzero(position)[0])
+    return position
+
+# Every (column, per 90) pair any chart reads from a stat table
+def charted_metrics(stat_type):
+    return list(dict.fromkeys((metric[1], metric[2]) for spec in chart_specs.values() for metric in spec["metrics"] if metric[0] == stat_type))
+
+# Extract every metric of a chart for one player, best match for the name
+def extract_player(spec, fbref, p_name):
+    stat_type = spec["metrics"][0][0]
+    table = read_stat_table(fbref, stat_type)
+    with timed("index"):
+        names = table.names
+    with timed("lookup"):
+        positions = names.lookup(p_name)
+    if not positions:
+        raise LookupError(f"'{p_name}' not found in {stat_type} stats")
+    return extract_row(spec, fbref, table.frame.index[positions[0]])
+
+# Extract every metric of a chart for one (league, season, team, player) row, a row fetch from each table's precomputed metrics
+def extract_row(spec, fbref, key):
+    with timed("extract"):
+        return extract_metrics(spec, fbref, key)
+
+def extract_metrics(spec, fbref, key):
+    metrics = spec["metrics"]
+    values = np.zeros(len(metrics))
+    percentiles = np.zeros(len(metrics))
+    player = None
+
+    stat_types = list(dict.fromkeys(metric[0] for metric in metrics))
+    for stat_type in stat_types:
+        table = read_stat_table(fbref, stat_type)
+        position = row_position(table.frame, key)
+        if player is None:
+            player = player_info(table.frame.iloc[[position]])
+
+        charted = table.charted()
+        selected = [i for i, metric in enumerate(metrics) if metric[0] == stat_type]
+        columns = [charted["index"][(metrics[i][1], metrics[i][2])] for i in selected]
+        values[selected] = charted["values"][position, columns]
+        percentiles[selected] = charted["percentiles"][position, columns]
+
+    return chart_stats(spec, player, values, percentiles)
+
+# A chart's numbers as the drawers take them, rounded as the chart shows them
+def chart_stats(spec, entry, values, percentiles):
+    values = np.nan_to_num(values)
+    entry["percentiles"] = np.round(np.nan_to_num(percentiles)).tolist()
+    decimals = spec.get("decimals", 2)
+    if spec.get("remainder"):
+        values[0] = int(values[0] - values[1:].sum())
+    if decimals == 0:
+        entry["stats"] = [int(round(value)) for value in values]
+    else:
+        entry["stats"] = np.round(values, decimals).tolist()
+    return entry
+
+# Extract every metric of a chart for one team (best match for the name) or league of a reader's tables, in the
+# shape of a player so the same drawers chart it. The legend shows the league (or number of teams) and the
+# full 90s of all its players.
+def extract_group(spec, fbref, level, name):
+    metrics = spec["metrics"]
+    values = np.zeros(len(metrics))
+    percentiles = np.zeros(len(metrics))
+    entry = None
+
+    for stat_type in dict.fromkeys(metric[0] for metric in metrics):
+        aggregated = read_stat_table(fbref, stat_type).aggregated(level)
+        if entry is None:
+            with timed("lookup"):
+                positions = aggregated["names"].lookup(name)
+            if not positions:
+                raise LookupError(f"'{name}' not found in {stat_type} stats")
+            group = aggregated["groups"][positions[0]]
+            entry = {
+                "name": group[2] if level == "team" else group[0],
+                "team": group[0] if level == "team" else f"{aggregated['teams'][positions[0]]} teams",
+                "season": group[1],
+                "90s": round(float(aggregated["90s"][positions[0]]), 1),
+                "ranked_among": "the league's teams" if level == "team" else "the big five leagues",
+            }
+        position = aggregated["groups"].get_loc(group)
+
+        selected = [i for i, metric in enumerate(metrics) if metric[0] == stat_type]
+        columns = [aggregated["index"][(metrics[i][1], metrics[i][2])] for i in selected]
+        values[selected] = aggregated["values"][position, columns]
+        percentiles[selected] = aggregated["percentiles"][position, columns]
+
+    return chart_stats(spec, entry, values, percentiles)
+
+# One colour per player, in the order they are compared
+player_colors = ['red', 'blue', 'green', 'darkorange', 'purple', 'brown', 'magenta', 'teal']
+
+# Scale each category so the biggest value among the players sits just inside the chart
+def normalize(players_stats):
+    stats = np.array(players_stats, dtype=float)
+    max_values = stats.max(axis=0)
+    max_values[max_values == 0] = 1  # All zero, keep them in the middle
+    return np.round(stats / max_values / 1.1, 2).tolist()
+
+# Legend entries with name, season, team and full 90s for each player
+def player_legend(p, color):
+    return [
+        plt.Line2D([0], [0], marker='s', color='w', label=f"{p['name']} ({season_display(p['season'])})", markerfacecolor=color, markersize=10),
+        plt.Line2D([0], [0], marker='s', color='w', label=f"{p['team']}"),
+        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p['90s']}"),
     ]
 
-    plt.legend(handles=custom_legend, loc='upper right', bbox_to_anchor=(1.5, 1.05))
-    ax.set_title(player1_name + " (" + season_display(player1_season) + ") vs " + player2_name + " (" + season_display(player2_season) + "): SCA and GCA Comparison (Per 90)", y=1.075)
-
-    plt.show()
-
-# 5 Playmaking
-def playmaking(fbref1, p1_name, fbref2, p2_name):  
-    player1_season_stats_pass = read_player_stats(fbref1, "passing", p1_name)
-    player2_season_stats_pass = read_player_stats(fbref2, "passing", p2_name)
-
-    player1_season_stats_poss = read_player_stats(fbref1, "possession", p1_name)
-    player2_season_stats_poss = read_player_stats(fbref2, "possession", p2_name)
-
-    player1_name = player1_season_stats_pass.index.get_level_values("player")[0]
-    player1_team = player1_season_stats_pass.index.get_level_values("team")[0]
-    player1_season = player1_season_stats_pass.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats_pass.index.get_level_values("player")[0]
-    player2_team = player2_season_stats_pass.index.get_level_values("team")[0]
-    player2_season = player2_season_stats_pass.index.get_level_values("season")[0]
-
-    p1_90s = player1_season_stats_pass["90s"].values[0]
-    p2_90s = player2_season_stats_pass["90s"].values[0]
-
-    p1_color = 'red'
-    p2_color = 'blue'
-
-    # Playmaking stat categories
-    playmaking_categories = ['Total Passes', 'Pass Accuracy (%)', 'Key Passes', 'Progressive Passes', 'Passes into Final Third', 'Passes into Penalty Area', 'Progressive Carries', 'Carries into Final Third', 'Carries into Penalty Area', 'Take Ons', 'Take Ons %', '']
-
-    # Number of categories
-    num_categories = len(playmaking_categories)
+def versus_title(players, title):
+    return " vs ".join(p["name"] + " (" + season_display(p["season"]) + ")" for p in players) + ": " + title
 
-    p1_playmaking_stats = [
-        round(player1_season_stats_pass["Total"]["Cmp"].values[0] / p1_90s, 2),
-        round(player1_season_stats_pass["Total"]["Cmp%"].values[0], 2),
-        round(player1_season_stats_pass["KP"].values[0] / p1_90s, 2),
-        round(player1_season_stats_pass["PrgP"].values[0] / p1_90s, 2),
-        round(player1_season_stats_pass["1/3"].values[0] / p1_90s, 2),
-        round(player1_season_stats_pass["PPA"].values[0] / p1_90s, 2),
-        round(player1_season_stats_poss["Carries"]["PrgC"].values[0] / p1_90s, 2),
-        round(player1_season_stats_poss["Carries"]["1/3"].values[0] / p1_90s, 2),
-        round(player1_season_stats_poss["Carries"]["CPA"].values[0] / p1_90s, 2),
-        round(player1_season_stats_poss["Take-Ons"]["Succ"].values[0] / p1_90s, 2),
-        round(player1_season_stats_poss["Take-Ons"]["Succ%"].values[0], 2),
-        round(player1_season_stats_pass["Total"]["Cmp"].values[0] / p1_90s, 2),
-    ]
+# What the radar percentiles rank against: the league-season's regulars, or the other teams (leagues) for groups
+def percentile_title(players):
+    if "ranked_among" in players[0]:
+        return f" - Percentiles among {players[0]['ranked_among']}"
+    return f" - League Percentiles (min. {percentile_min_90s} full 90s)"
 
-    p2_playmaking_stats = [
-        round(player2_season_stats_pass["Total"]["Cmp"].values[0] / p2_90s, 2),
-        round(player2_season_stats_pass["Total"]["Cmp%"].values[0], 2),
-        round(player2_season_stats_pass["KP"].values[0] / p2_90s, 2),
-        round(player2_season_stats_pass["PrgP"].values[0] / p2_90s, 2),
-        round(player2_season_stats_pass["1/3"].values[0] / p2_90s, 2),
-        round(player2_season_stats_pass["PPA"].values[0] / p2_90s, 2),
-        round(player2_season_stats_poss["Carries"]["PrgC"].values[0] / p2_90s, 2),
-        round(player2_season_stats_poss["Carries"]["1/3"].values[0] / p2_90s, 2),
-        round(player2_season_stats_poss["Carries"]["CPA"].values[0] / p2_90s, 2),
-        round(player2_season_stats_poss["Take-Ons"]["Succ"].values[0] / p2_90s, 2),
-        round(player2_season_stats_poss["Take-Ons"]["Succ%"].values[0], 2),
-        round(player2_season_stats_pass["Total"]["Cmp"].values[0] / p2_90s, 2),
-    ]
+# Radar charts (Standard, Shooting, Final Ball, Goal and Shot Creation, Playmaking), every player overlaid.
+# Scaled against each other by default, or placed by their percentile in their own league-season.
+def radar_angles(spec):
+    # Repeat the first category at the end to close the shape
+    categories = [metric[3] for metric in spec["metrics"]] + ['']
+    return categories, np.flip(np.linspace(0, 2 * np.pi, len(categories), endpoint=True))
 
-    p1_normalized = []
-    p2_normalized = []
-    
-    for p1_stat, p2_stat in zip(p1_playmaking_stats, p2_playmaking_stats):
-        max_value = max(p1_stat, p2_stat)
-        p1_normalized.append(round(p1_stat/max_value/1.1, 2))
-        p2_normalized.append(round(p2_stat/max_value/1.1, 2))
-    
-    # Create a list of angles for the radar chart
-    angles = np.flip(np.linspace(0, 2 * np.pi, num_categories, endpoint=True))
+# The parts of a radar that never change: circular axes, category and ring labels.
+# Drawn on its own figure, or in a cell of a bigger one (the full report).
+def radar_scaffold(spec, n_players, percentiles=False, fig=None, cell=None):
+    categories, angles = radar_angles(spec)
 
     # Make the plot circular
-    fig = plt.figure(figsize=(10, 6))
-    ax = fig.add_subplot(111, polar=True)
-
-    # Plot the data for Player 1
-    line1, = ax.plot(angles, p1_normalized, marker='o', label=player1_name, color=p1_color)
-    ax.fill(angles, p1_normalized, alpha=0.25, color=p1_color)
-
-    # Plot the data for Player 2
-    line2, = ax.plot(angles, p2_normalized, marker='o', label=player2_name, color=p2_color)
-    ax.fill(angles, p2_normalized, alpha=0.25, color=p2_color)
+    if fig is None:
+        fig = plt.figure(figsize=(10, 6))
+        ax = fig.add_subplot(111, polar=True)
+    else:
+        ax = fig.add_subplot(cell.subgridspec(1, 2, width_ratios=[3, 2])[0], polar=True)  # Room on the right for the legend
 
     # Set the angle labels
     ax.set_xticks(angles)
-    ax.set_xticklabels(playmaking_categories)
+    ax.set_xticklabels(categories)
 
     # Set y-axis labels
     ax.set_rlabel_position(0)
-    plt.yticks([0.2, 0.4, 0.6, 0.8], ["0.2", "0.4", "0.6", "0.8"], color="grey", size=10)
-    plt.ylim(0, 1)
-
-    # Add numeric labels for Player 1
-    for angle, norm_stat, stat in zip(angles, p1_normalized, p1_playmaking_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line1.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Add numeric labels for Player 2
-    for angle, norm_stat, stat in zip(angles, p2_normalized, p2_playmaking_stats):
-        x = angle
-        y = norm_stat + 0.075
-        ax.annotate(
-            str(stat),
-            xy=(x, y),
-            xytext=(0, 0),
-            textcoords='offset points',
-            color=line2.get_color(),
-            fontsize=10,
-            fontweight='bold',
-            ha="center",
-            va="center",
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
-        )
-
-    # Create a custom legend
-    custom_legend = [
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_name} ({season_display(player1_season)})", markerfacecolor=p1_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p1_90s}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_name} ({season_display(player2_season)})", markerfacecolor=p2_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p2_90s}"),
-    ]
-
-    plt.legend(handles=custom_legend, loc='upper right', bbox_to_anchor=(1.5, 1.05))
-    ax.set_title(player1_name + " (" + season_display(player1_season) + ") vs " + player2_name + " (" + season_display(player2_season) + "): Playmaking Comparison (Per 90)", y=1.075)
-
-    plt.show()
-
-# 6 Possession
-def possession(fbref1, p1_name, fbref2, p2_name):
-    player1_season_stats = read_player_stats(fbref1, "possession", p1_name)
-    player2_season_stats = read_player_stats(fbref2, "possession", p2_name)
-
-    player1_name = player1_season_stats.index.get_level_values("player")[0]
-    player1_team = player1_season_stats.index.get_level_values("team")[0]
-    player1_season = player1_season_stats.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats.index.get_level_values("player")[0]
-    player2_team = player2_season_stats.index.get_level_values("team")[0] 
-    player2_season = player2_season_stats.index.get_level_values("season")[0]
-
-    # Possession stat categories
-    possession_categories = ["Def Pen", "Def 3rd", "Mid 3rd", "Att 3rd", "Att Pen"]
-
-    player1_possession_stats = player1_season_stats["Touches"][possession_categories].values.tolist()[0]
-    player2_possession_stats = player2_season_stats["Touches"][possession_categories].values.tolist()[0]
-
-    # Create the side-by-side pie charts
-    fig, ax = plt.subplots(1, 2, figsize=(16, 8))
-
-    # Player 1 Pie Chart
-    wedges1, texts1, autotexts1 = ax[0].pie(player1_possession_stats, labels=possession_categories, autopct=autopct_format(player1_possession_stats), startangle=140)
-    for i, wedge in enumerate(wedges1):
-        wedge.set_facecolor("red")
-        wedge.set_alpha((i+1)/5)
-
-    ax[0].set_title(player1_name + " (" + season_display(player1_season) + "): Total Touches")
-    ax[0].axis('equal')
-    legend_labels1 = [f'{label}: {autotext.get_text()}' for label, autotext in zip(possession_categories, autotexts1)]
-    ax[0].legend(wedges1, legend_labels1,title=player1_name + "'s Touches\n (" + player1_team + ")",  loc="center left", bbox_to_anchor=(1.05, 0.5))
-
-    # Player 2 Pie Chart
-    wedges2, texts2, autotexts2 = ax[1].pie(player2_possession_stats, labels=possession_categories, autopct=autopct_format(player2_possession_stats), startangle=140)
-    for i, wedge in enumerate(wedges2):
-        wedge.set_facecolor("blue")
-        wedge.set_alpha((i+1)/5)
-
-    ax[1].set_title(player2_name + " (" + season_display(player2_season) + "): Total Touches")
-    ax[1].axis('equal')
-    legend_labels2 = [f'{label}: {autotext.get_text()}' for label, autotext in zip(possession_categories, autotexts2)]
-    ax[1].legend(wedges2, legend_labels2, title=player2_name + "'s Touches\n (" + player2_team + ")", loc="center left", bbox_to_anchor=(-0.45, 0.5))
-
-    plt.tight_layout()
-    plt.show()
-
-# 7 Pass Types
-def pass_types(fbref1, p1_name, fbref2, p2_name):
-    player1_season_stats = read_player_stats(fbref1, "passing_types", p1_name)
-    player2_season_stats = read_player_stats(fbref2, "passing_types", p2_name)
-
-    player1_name = player1_season_stats.index.get_level_values("player")[0]
-    player1_team = player1_season_stats.index.get_level_values("team")[0]
-    player1_season = player1_season_stats.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats.index.get_level_values("player")[0]
-    player2_team = player2_season_stats.index.get_level_values("team")[0] 
-    player2_season = player2_season_stats.index.get_level_values("season")[0]
-
-    # Passing Type stat categories
-    passing_types_categories = ["Live", "Through Balls", "Crosses", "Switches"]
-    passing_types_categories_input = ["TB", "Crs", "Sw"]
-
-    player1_threestats = player1_season_stats["Pass Types"][passing_types_categories_input].values.tolist()[0]
-    player2_threestats = player2_season_stats["Pass Types"][passing_types_categories_input].values.tolist()[0]
-
-    player1_passing_types_stats = [(int(player1_season_stats["Pass Types"]["Live"].values[0] - sum(player1_threestats)))]
-    player2_passing_types_stats = [(int(player2_season_stats["Pass Types"]["Live"].values[0] - sum(player2_threestats)))]
-
-    player1_passing_types_stats.extend(player1_threestats)
-    player2_passing_types_stats.extend(player2_threestats)
-
-    # Create the side-by-side pie charts
-    fig, ax = plt.subplots(1, 2, figsize=(16, 8))
-
-    # Player 1 Pie Chart
-    p1_colors = ["darkred", "red", "darkorange", "orange"]
-    wedges1, texts1, autotexts1 = ax[0].pie(player1_passing_types_stats, labels=passing_types_categories, autopct=autopct_format(player1_passing_types_stats), startangle=140)
-    for i, wedge in enumerate(wedges1):
-        wedge.set_facecolor(p1_colors[i])
-        wedge.set_alpha(0.8)
-
-    ax[0].set_title(player1_name + " (" + season_display(player1_season) + "): Pass Types", y=1.075)
-    ax[0].axis('equal')
-    legend_labels1 = [f'{label}: {autotext.get_text()}' for label, autotext in zip(passing_types_categories, autotexts1)]
-    ax[0].legend(wedges1, legend_labels1,title=player1_name + "'s Pass Types\n (" + player1_team + ")",  loc="center left", bbox_to_anchor=(1.05, 0.5))
-
-    # Player 2 Pie Chart
-    p2_colors = ["darkblue", "blue", "lightskyblue", "cornflowerblue"]
-    wedges2, texts2, autotexts2 = ax[1].pie(player2_passing_types_stats, labels=passing_types_categories, autopct=autopct_format(player2_passing_types_stats), startangle=140)
-    for i, wedge in enumerate(wedges2):
-        wedge.set_facecolor(p2_colors[i])
-        wedge.set_alpha(0.8)
+    if percentiles:
+        ax.set_yticks([pct / 100 / 1.1 for pct in (25, 50, 75)], ["25th", "50th", "75th"], color="grey", size=10)
+    else:
+        ax.set_yticks([0.2, 0.4, 0.6, 0.8], ["0.2", "0.4", "0.6", "0.8"], color="grey", size=10)
+    ax.set_ylim(0, 1)
+    return fig, [ax]
+
+# The players' shapes, numbers, legend and title, returned so a template can swap them for the next players
+def radar_data(fig, axes, spec, players, percentiles=False, report=False):
+    ax = axes[0]
+    categories, angles = radar_angles(spec)
+    players_stats = [p["stats"] + p["stats"][:1] for p in players]
+    if percentiles:
+        players_normalized = [[round(pct / 100 / 1.1, 2) for pct in p["percentiles"] + p["percentiles"][:1]] for p in players]
+    else:
+        players_normalized = normalize(players_stats)
+
+    artists = []
+    custom_legend = []
+    for i, (p, stats, normalized) in enumerate(zip(players, players_stats, players_normalized)):
+        color = player_colors[i % len(player_colors)]
+
+        # Plot the data for the player
+        line, = ax.plot(angles, normalized, marker='o', label=p["name"], color=color)
+        artists.append(line)
+        artists.extend(ax.fill(angles, normalized, alpha=0.25, color=color))
+
+        # Add numeric labels for the player
+        for angle, norm_stat, stat in zip(angles, normalized, stats):
+            artists.append(ax.annotate(
+                str(stat),
+                xy=(angle, norm_stat + 0.075),
+                xytext=(0, 0),
+                textcoords='offset points',
+                color=line.get_color(),
+                fontsize=10,
+                fontweight='bold',
+                ha="center",
+                va="center",
+                bbox=dict(boxstyle='round,pad=0.3', facecolor=(1, 1, 1, 0.5), edgecolor='none')
+            ))
+        custom_legend.extend(player_legend(p, color))
+
+    artists.append(ax.legend(handles=custom_legend, loc='upper right', bbox_to_anchor=spec["legend_anchor"]))
+    title = spec["title"] + (percentile_title(players) if percentiles else "")
+    ax.set_title(title if report else versus_title(players, title), y=1.075)  # The report's own title names the players
+    return artists
+
+# Pie charts (Possession, Pass Types), two per row with the legends on the outside
+def pies_scaffold(spec, n_players, percentiles=False, fig=None, cell=None):
+    rows = (n_players + 1) // 2
+    if fig is None:
+        fig, ax = plt.subplots(rows, 2, figsize=(16, 8 * rows), squeeze=False)
+    else:
+        # Every pie has a column of its own on its right for its legend
+        grid = cell.subgridspec(rows, 4, wspace=0)
+        ax = np.array([[fig.add_subplot(grid[row, column]) for column in (0, 2)] for row in range(rows)])
+    ax = ax.flatten()
+
+    # Odd number of players, leave the last slot empty
+    for empty in ax[n_players:]:
+        empty.axis('off')
+    return fig, list(ax)
+
+def pies_data(fig, ax, spec, players, percentiles=False, report=False):
+    categories = [metric[3] for metric in spec["metrics"]]
+
+    artists = []
+    for i, p in enumerate(players):
+        if i < len(spec["colors"]):
+            colors = spec["colors"][i]
+        else:
+            colors = [player_colors[i % len(player_colors)]] * len(categories)
+        legend_anchor = (1.05, 0.5) if i % 2 == 0 or report else (-0.45, 0.5)
+
+        # The report's legends already label every slice, outside labels would spill into the next legend
+        labels = None if report else categories
+        wedges, texts, autotexts = ax[i].pie(p["stats"], labels=labels, autopct=autopct_format(p["stats"]), startangle=140)
+        for wedge, color, alpha in zip(wedges, colors, spec["alphas"]):
+            wedge.set_facecolor(color)
+            wedge.set_alpha(alpha)
+
+        title = p["name"] + " (" + season_display(p["season"]) + ")"
+        ax[i].set_title(title if report else title + ": " + spec["title"], y=spec["title_y"])  # In the report the legend names the chart
+        ax[i].axis('equal')
+        legend_labels = [f'{label}: {autotext.get_text()}' for label, autotext in zip(categories, autotexts)]
+        if report:
+            # The pie's title already names the player, a narrower legend fits its column
+            legend = ax[i].legend(wedges, legend_labels, title=spec["legend_title"] + "\n(" + p["team"] + ")", loc="center left", bbox_to_anchor=legend_anchor, fontsize="small", title_fontsize="small")
+        else:
+            legend = ax[i].legend(wedges, legend_labels, title=p["name"] + "'s " + spec["legend_title"] + "\n (" + p["team"] + ")", loc="center left", bbox_to_anchor=legend_anchor)
+        artists.extend(wedges + texts + autotexts + [legend])
+    return artists
 
-    ax[1].set_title(player2_name + " (" + season_display(player2_season) + "): Pass Types", y=1.075)
-    ax[1].axis('equal')
-    legend_labels2 = [f'{label}: {autotext.get_text()}' for label, autotext in zip(passing_types_categories, autotexts2)]
-    ax[1].legend(wedges2, legend_labels2, title=player2_name + "'s Pass Types\n (" + player2_team + ")", loc="center left", bbox_to_anchor=(-0.45, 0.5))
-
-    plt.tight_layout()
-    plt.show()
-
-# 8 Passing Distance
-def passing_distance(fbref1, p1_name, fbref2, p2_name):
-    player1_season_stats = read_player_stats(fbref1, "passing", p1_name)
-    player2_season_stats = read_player_stats(fbref2, "passing", p2_name)
-
-    player1_name = player1_season_stats.index.get_level_values("player")[0]
-    player1_team = player1_season_stats.index.get_level_values("team")[0]
-    player1_season = player1_season_stats.index.get_level_values("season")[0]
-
-    player2_name = player2_season_stats.index.get_level_values("player")[0]
-    player2_team = player2_season_stats.index.get_level_values("team")[0] 
-    player2_season = player2_season_stats.index.get_level_values("season")[0]
-
-    p1_90s = player1_season_stats["90s"].values[0]
-    p2_90s = player2_season_stats["90s"].values[0]
+# Completed out of attempted passes, as a label above a bar
+def pass_ratio_label(completed, attempted):
+    percentage = round((completed / attempted) * 100) if attempted else 0
+    return f"{completed}/{attempted} ($\\mathbf{{{percentage}\\%}}$)"
 
+# Passing Distance bar chart, one bar per player in each group
+def bars_scaffold(spec, n_players, percentiles=False, fig=None, cell=None):
     # Creating a bar chart
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    # Loop through pass types
-    pass_types = ["Short", "Medium", "Long"]
-    p1_color = 'red'
-    p2_color = 'blue'
-
-    p1_prog_p90 = round((player1_season_stats["PrgP"].values[0])/p1_90s)
-    p1_cmp_p90 = round((player1_season_stats["Total"]["Cmp"].values[0])/p1_90s)
-    p1_att_p90 = round((player1_season_stats["Total"]["Att"].values[0])/p1_90s)
-
-    p2_prog_p90 = round((player2_season_stats["PrgP"].values[0])/p2_90s)
-    p2_cmp_p90 = round((player2_season_stats["Total"]["Cmp"].values[0])/p2_90s)
-    p2_att_p90 = round((player2_season_stats["Total"]["Att"].values[0])/p2_90s)
-
-    ax.bar(0 - 0.15, p1_prog_p90, width=0.3, color=p1_color)
-    ax.bar(0 - 0.15, p1_cmp_p90, width=0.3, alpha=0.125, color=p1_color)
-    ax.bar(0 - 0.15, p1_att_p90, width=0.3, alpha=0.250, color=p1_color)
-
-    ax.bar(0 + 0.15, p2_prog_p90, width=0.3, color=p2_color)
-    ax.bar(0 + 0.15, p2_cmp_p90, width=0.3, alpha=0.125, color=p2_color)
-    ax.bar(0 + 0.15, p2_att_p90, width=0.3, alpha=0.250, color=p2_color)
-
-    # Calculating and formatting the completion percentage
-    p1_prog_percentage = round((p1_prog_p90 / p1_att_p90) * 100)
-    p2_prog_percentage = round((p2_prog_p90 / p2_att_p90) * 100)
-
-    # Adding labels for the ratios directly above the bars
-    ax.text(- 0.15, p1_att_p90 + 0.5, f"{p1_prog_p90}/{p1_att_p90} ($\\mathbf{{{p1_prog_percentage}\\%}}$)", ha='center', fontsize=8, color='black')
-    ax.text(0.15, p2_att_p90 + 0.5, f"{p2_prog_p90}/{p2_att_p90} ($\\mathbf{{{p2_prog_percentage}\\%}}$)", ha='center', fontsize=8, color='black')
-
-    for i, pass_type in enumerate(pass_types, start = 1):
-
-        p1_cmp_value = round((player1_season_stats[pass_type]["Cmp"].values[0])/p1_90s)
-        p1_att_value = round((player1_season_stats[pass_type]["Att"].values[0])/p1_90s)
-        p2_cmp_value = round((player2_season_stats[pass_type]["Cmp"].values[0])/p2_90s)
-        p2_att_value = round((player2_season_stats[pass_type]["Att"].values[0])/p2_90s)
-
-        # Player 1's Values
-        ax.bar(i - 0.15, p1_att_value, width=0.3, alpha=0.250, color=p1_color)
-        ax.bar(i - 0.15, p1_cmp_value, width=0.3, color=p1_color)
-
-        # Player 2's Values
-        ax.bar(i + 0.15, p2_att_value, width=0.3, alpha=0.250, color=p2_color)
-        ax.bar(i + 0.15, p2_cmp_value, width=0.3, color=p2_color)
-
-        # Calculating and formatting the completion percentage
-        p1_cmp_percentage = round((p1_cmp_value / p1_att_value) * 100)
-        p2_cmp_percentage = round((p2_cmp_value / p2_att_value) * 100)
-
-        # Adding labels for the ratios directly above the bars
-        ax.text(i - 0.15, p1_att_value + 0.5, f"{p1_cmp_value}/{p1_att_value} ($\\mathbf{{{p1_cmp_percentage}\\%}}$)", ha='center', fontsize=8, color='black')
-        ax.text(i + 0.15, p2_att_value + 0.5, f"{p2_cmp_value}/{p2_att_value} ($\\mathbf{{{p2_cmp_percentage}\\%}}$)", ha='center', fontsize=8, color='black')
-
+    if fig is None:
+        fig, ax = plt.subplots(figsize=(12, 6))
+    else:
+        ax = fig.add_subplot(cell)
 
-    # Adding labels and title
+    # Adding labels
     ax.set_ylabel("Amount of Passes (Per 90)")
-    pass_types = ["Progressive" , "Short (5-15yds)", "Medium (15-30yds)", "Long (>30yds)"]
-    ax.set_title(player1_name + " (" + season_display(player1_season) + ") vs " + player2_name + " (" + season_display(player2_season) + "): Pass Distance Comparison", y=1.075)
+    pass_types = [spec["metrics"][0][3]] + [metric[3] for metric in spec["metrics"][3::2]]
     ax.set_xticks(range(len(pass_types)))
     ax.set_xticklabels(pass_types)
+    return fig, [ax]
+
+def bars_data(fig, axes, spec, players, percentiles=False, report=False):
+    ax = axes[0]
+    width = 0.6 / len(players)
+
+    artists = []
+    custom_legend = []
+    for i, p in enumerate(players):
+        color = player_colors[i % len(player_colors)]
+        offset = -0.3 + width / 2 + i * width
+        prog_p90, cmp_p90, att_p90 = p["stats"][:3]
+
+        artists.append(ax.bar(0 + offset, prog_p90, width=width, color=color))
+        artists.append(ax.bar(0 + offset, cmp_p90, width=width, alpha=0.125, color=color))
+        artists.append(ax.bar(0 + offset, att_p90, width=width, alpha=0.250, color=color))
+        artists.append(ax.text(offset, att_p90 + 0.5, pass_ratio_label(prog_p90, att_p90), ha='center', fontsize=8, color='black'))
+
+        # Short, Medium and Long, completed over attempted
+        for group in range(1, 4):
+            cmp_value, att_value = p["stats"][1 + 2 * group:3 + 2 * group]
+            artists.append(ax.bar(group + offset, att_value, width=width, alpha=0.250, color=color))
+            artists.append(ax.bar(group + offset, cmp_value, width=width, color=color))
+            artists.append(ax.text(group + offset, att_value + 0.5, pass_ratio_label(cmp_value, att_value), ha='center', fontsize=8, color='black'))
+
+        custom_legend.extend(player_legend(p, color))
+
+    ax.set_title(spec["title"] if report else versus_title(players, spec["title"]), y=1.075)
+    artists.append(ax.legend(handles=custom_legend, loc='upper right'))
+    return artists
+
+# Each kind of chart is drawn in two steps: the scaffolding, then the players' data on top of it,
+# and pies and bars are tightened around their outside legends and labels afterwards
+chart_drawers = {
+    "radar": (radar_scaffold, radar_data, False),
+    "pie": (pies_scaffold, pies_data, True),
+    "bars": (bars_scaffold, bars_data, True),
+}
+
+# Draw a chart from the players' extracted numbers, percentiles only change the radar charts
+def draw_chart(statistic, players, percentiles=False):
+    spec = chart_specs[statistic]
+    scaffold, data, tight = chart_drawers[spec["kind"]]
+    fig, axes = scaffold(spec, len(players), percentiles)
+    data(fig, axes, spec, players, percentiles)
+    if tight:
+        fig.tight_layout()
+    return fig
+
+# A chart's figure kept for the whole process: the scaffolding is drawn once, and each comparison only
+# swaps the players' artists. With blit (radars only, PNG only) the rendered scaffolding is also kept as an
+# Agg buffer and just the players' artists are rasterized on top of it, on the full, untrimmed figure.
+class ChartTemplate:
+    def __init__(self, statistic, n_players, percentiles=False, blit=False):
+        self.spec = chart_specs[statistic]
+        self.percentiles = percentiles
+        scaffold, self.data, self.tight = chart_drawers[self.spec["kind"]]
+        self.fig, self.axes = scaffold(self.spec, n_players, percentiles)
+        self.layout = {name: getattr(self.fig.subplotpars, name) for name in ("left", "right", "bottom", "top", "wspace", "hspace")}
+        self.artists = []
+        self.blit = blit and self.spec["kind"] == "radar"
+        self.background = None
+
+    def draw(self, players):
+        for artist in self.artists:
+            artist.remove()
+        # Limits and tight_layout start over from the scaffold, as on a new figure
+        for ax in self.axes:
+            ax.relim()
+        self.fig.subplots_adjust(**self.layout)
+        self.artists = self.data(self.fig, self.axes, self.spec, players, self.percentiles)
+        if self.tight:
+            self.fig.tight_layout()
+        return self.fig
+
+    def image(self, players, fmt="png"):
+        if self.blit and fmt == "png":
+            return self.blit_image(players)
+        self.draw(players)
+        buffer = io.BytesIO()
+        self.fig.savefig(buffer, format=fmt, bbox_inches="tight")
+        return buffer.getvalue()
+
+    # The axes' own parts drawn in between the players' artists: gridlines and tick labels sit above the fills
+    def scaffold_artists(self):
+        return [artist for ax in self.axes for artist in [*ax.spines.values(), ax.xaxis, ax.yaxis, ax.title]]
+
+    def blit_image(self, players):
+        canvas = self.fig.canvas
+        if self.background is None:
+            # Only the figure and axes backgrounds, the rest is layered with the players' artists below. A first
+            # full draw settles which parts show (a full circle radar hides its start, end and inner spines).
+            canvas.draw()
+            visible = [artist.get_visible() for artist in self.scaffold_artists()]
+            for artist in self.scaffold_artists():
+                artist.set_visible(False)
+            canvas.draw()
+            self.background = canvas.copy_from_bbox(self.fig.bbox)
+            for artist, shown in zip(self.scaffold_artists(), visible):
+                artist.set_visible(shown)
+        self.draw(players)
+        for ax in self.axes:
+            ax.apply_aspect()  # Square the radar again, as a full draw would
+        canvas.restore_region(self.background)
+        # In z-order like a full draw, so each player's fill stays under the lines, labels and grid
+        for artist in sorted(self.artists + self.scaffold_artists(), key=lambda artist: artist.get_zorder()):
+            self.fig.draw_artist(artist)
+        buffer = io.BytesIO()
+        plt.imsave(buffer, np.asarray(canvas.buffer_rgba()), format="png", dpi=self.fig.dpi)
+        return buffer.getvalue()
+
+chart_templates = {}
+
+# All eight charts on one figure, two per row, radars first and pies last
+report_rows = [
+    ["standard", "shooting"],
+    ["final_ball", "goal_shot_creation"],
+    ["playmaking", "passing_distance"],
+    ["possession", "pass_types"],
+]
+
+def draw_report(charts, percentiles=False):
+    players = next(iter(charts.values()))
+    pie_rows = (len(players) + 1) // 2
+    heights = [1] * (len(report_rows) - 1) + [pie_rows]
+    fig = plt.figure(figsize=(24, 7 * sum(heights)))
+    grid = fig.add_gridspec(len(report_rows), 2, height_ratios=heights, hspace=0.45, wspace=0.15, top=0.95, bottom=0.03)
+
+    for r, row in enumerate(report_rows):
+        for c, statistic in enumerate(row):
+            spec = chart_specs[statistic]
+            scaffold, data, tight = chart_drawers[spec["kind"]]
+            fig, axes = scaffold(spec, len(charts[statistic]), percentiles, fig, grid[r, c])
+            data(fig, axes, spec, charts[statistic], percentiles, report=True)
+
+    fig.suptitle(versus_title(players, "Full Report"), fontsize=20, y=0.995)
+    return fig
+
+def chart_template(statistic, n_players, percentiles=False, blit=False):
+    key = (statistic, n_players, bool(percentiles), bool(blit))
+    if key not in chart_templates:
+        chart_templates[key] = ChartTemplate(statistic, n_players, percentiles, blit)
+    return chart_templates[key]
+
+
+# Seasons from first to last, both given like the menu accepts them ("2018/19", "1819"...)
+def season_range(first, last):
+    first, last = season_format(first), season_format(last)
+    if not (first and last):
+        return []
+    return [str(year) for year in range(int(first), int(last) + 1)]
+
+# One player's rows for a chart across several seasons, read from a single multi-season table.
+# A season split between two clubs uses the club with the most minutes.
+def career_series(statistic, p_name, league, seasons):
+    spec = chart_specs[statistic]
+    fbref = get_fbref(league, seasons)
+    table = read_stat_table(fbref, spec["metrics"][0][0])
+
+    positions = table.names.lookup(p_name)
+    if not positions:
+        raise LookupError(f"'{p_name}' not found in {league} between {seasons[0]} and {seasons[-1]}")
+
+    # Every row of the best match, one per season, most minutes first (lookup order)
+    name = table.names.folded[positions[0]]
+    by_season = {}
+    for position in table.names.exact[name]:
+        key = table.frame.index[position]
+        best = by_season.get(key[1])
+        if best is None or table.names.nineties[position] > table.names.nineties[best]:
+            by_season[key[1]] = position
+
+    return [extract_row(spec, fbref, table.frame.index[by_season[season]]) for season in sorted(by_season, key=season_start)]
+
+# First calendar year of a season, so seasons sort in order across 1999/2000 ("9900" is 1999, "0001" is 2000)
+def season_start(season):
+    season = str(season)
+    if len(season) == 4 and season.isdigit() and int(season[2:]) == (int(season[:2]) + 1) % 100:
+        return int(season[:2]) + (2000 if int(season[:2]) <= 79 else 1900)
+    return int(season)
+
+# Per 90 trend of every metric of a chart, one small line chart per metric
+def draw_career(statistic, series):
+    spec = chart_specs[statistic]
+    labels = [metric[3] for metric in spec["metrics"]]
+    seasons = [season_display(p["season"]) for p in series]
+    columns = 3
+    rows = (len(labels) + columns - 1) // columns
+
+    fig, ax = plt.subplots(rows, columns, figsize=(5 * columns, 3.5 * rows), squeeze=False)
+    ax = ax.flatten()
+    for i, label in enumerate(labels):
+        values = [p["stats"][i] for p in series]
+        ax[i].plot(seasons, values, marker='o', color='red')
+        ax[i].fill_between(seasons, values, alpha=0.25, color='red')
+        for season, value in zip(seasons, values):
+            ax[i].annotate(str(value), xy=(season, value), xytext=(0, 6), textcoords='offset points', ha="center", fontsize=8, fontweight='bold')
+        ax[i].set_title(label, fontsize=10)
+        ax[i].set_ylim(bottom=0)
+        ax[i].margins(y=0.2)
+
+    for empty in ax[len(labels):]:
+        empty.axis('off')
+
+    p = series[-1]
+    fig.suptitle(f"{p['name']} ({seasons[0]} to {seasons[-1]}): {spec['title']}")
+    fig.tight_layout()
+    return fig
+
+# Career trend for one player, shown in a window or saved to output
+def compare_career(statistic, p_name, league, seasons, output=None):
+    if statistic not in chart_specs:
+        print("Invalid statistic: ", statistic)
+        return
 
-    # Create a custom legend
-    custom_legend = [
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_name} ({season_display(player1_season)})", markerfacecolor=p1_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player1_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p1_90s}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_name} ({season_display(player2_season)})", markerfacecolor=p2_color, markersize=10),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"{player2_team}"),
-        plt.Line2D([0], [0], marker='s', color='w', label=f"Full 90s: {p2_90s}"),
+    fig = draw_career(statistic, career_series(statistic, p_name, league, seasons))
+    if output:
+        fig.savefig(output, bbox_inches="tight")
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+# Charts whose per 90 metrics describe a player's style for the similar player search
+similarity_charts = ["standard", "final_ball", "playmaking"]
+
+# Standardized feature matrix of every player in some leagues and a season, searched by brute force
+class SimilarityIndex:
+    def __init__(self, fbref, min_90s):
+        features = list(dict.fromkeys(
+            (metric[0], metric[1], metric[2]) for chart in similarity_charts for metric in chart_specs[chart]["metrics"] if metric[2]
+        ))
+
+        # One block of columns per stat table, joined on the (league, season, team, player) rows they all have
+        blocks = []
+        for stat_type in dict.fromkeys(feature[0] for feature in features):
+            table = read_stat_table(fbref, stat_type)
+            charted = table.charted()
+            columns = [charted["index"][(column, per90)] for feature_type, column, per90 in features if feature_type == stat_type]
+            blocks.append(pd.DataFrame(charted["values"][:, columns], index=table.frame.index))
+        matrix = pd.concat(blocks, axis=1, join="inner")
+        matrix = matrix[~matrix.index.duplicated()]
+
+        nineties = full_90s(read_stat_table(fbref, "standard").frame).reindex(matrix.index).to_numpy(dtype=float)
+        values = matrix.to_numpy(dtype=float)
+
+        # Standardize with the regulars only, so a few minutes off the bench do not stretch the scale
+        regulars = nineties >= min_90s
+        mean = np.nanmean(values[regulars], axis=0)
+        std = np.nanstd(values[regulars], axis=0)
+        std[std == 0] = 1
+        values = np.nan_to_num((values - mean) / std).astype(np.float32)
+
+        self.keys = matrix.index
+        self.nineties = nineties
+        self.regulars = regulars
+        self.matrix = values
+        self.norms = np.einsum("ij,ij->i", values, values)
+        self.names = NameIndex(self.keys.get_level_values("player"), nineties)
+
+    # The k nearest regulars to a row, nearest first, as (position, distance)
+    def nearest(self, position, k):
+        query = self.matrix[position]
+        distances = self.norms - 2 * (self.matrix @ query) + self.norms[position]
+        distances[~self.regulars] = np.inf
+        distances[position] = np.inf
+        k = min(k, int(np.isfinite(distances).sum()))
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest])]
+        return [(int(i), float(np.sqrt(max(distances[i], 0)))) for i in nearest]
+
+similarity_indexes = {}
+
+# Players whose per 90 profile is closest to the given player's, across the leagues (all five by default).
+# Returns the (league, season, team, player) row that was matched, and the matches nearest first.
+def similar_players(p_name, season, k=10, league=None, leagues=big_five_leagues, min_90s=5):
+    fbref = get_fbref(leagues, season)
+    key = (",".join(fbref.leagues), ",".join(str(s) for s in fbref.seasons), min_90s)
+    index = similarity_indexes.get(key)
+    if index is None:
+        index = similarity_indexes[key] = SimilarityIndex(fbref, min_90s)
+
+    positions = index.names.lookup(p_name)
+    if league:
+        positions = [position for position in positions if index.keys[position][0] == league]
+    if not positions:
+        raise LookupError(f"'{p_name}' not found in {season}")
+
+    target = positions[0]
+    return index.keys[target], [
+        {"league": index.keys[i][0], "team": index.keys[i][2], "player": index.keys[i][3], "90s": index.nineties[i], "distance": round(distance, 3)}
+        for i, distance in index.nearest(target, k)
     ]
 
-    ax.legend(handles=custom_legend, loc='upper right')
 
-    # Display the bar chart
-    plt.tight_layout()
-    plt.show()
+# Every charted metric by name: the chart labels ("Progressive Carries") and table columns ("possession:Carries/PrgC")
+def leaderboard_metrics():
+    metrics = {}
+    for spec in chart_specs.values():
+        for stat_type, column, per90, label in spec["metrics"]:
+            metric = (stat_type, column, per90, label)
+            metrics.setdefault(fold_name(label), metric)
+            metrics.setdefault(fold_name(f"{stat_type}:{'/'.join(part for part in column if part)}"), metric)
+    return metrics
+
+# Top n players for a metric (per 90 where the charts use per 90) with at least min_90s full 90s played
+def leaderboard(metric, season, n=10, leagues=big_five_leagues, min_90s=10):
+    metrics = leaderboard_metrics()
+    if fold_name(metric) not in metrics:
+        raise KeyError(f"unknown metric '{metric}'")
+    stat_type, column, per90, label = metrics[fold_name(metric)]
+
+    table = read_stat_table(get_fbref(leagues, season), stat_type)
+    charted = table.charted()
+    values = charted["values"][:, charted["index"][(column, per90)]].copy()
+    values[~(full_90s(table.frame).to_numpy(dtype=float) >= min_90s)] = np.nan
+    values[np.isnan(values)] = -np.inf
+
+    # Only the top n are sorted, the rest of the table is just partitioned
+    n = min(n, int(np.isfinite(values).sum()))
+    if n <= 0:
+        return label, []
+    top = np.argpartition(-values, n - 1)[:n]
+    top = top[np.argsort(-values[top], kind="stable")]
+
+    nineties = full_90s(table.frame).to_numpy(dtype=float)
+    return label, [
+        {"league": table.frame.index[i][0], "team": table.frame.index[i][2], "player": table.frame.index[i][3], "90s": nineties[i], "value": round(float(values[i]), 2)}
+        for i in top
+    ]
 
 
+# Export column of a charted metric, e.g. possession_Touches_Att_3rd_p90 or passing_Total_Cmp_pct
+def metric_column(stat_type, column, per90):
+    name = "_".join([stat_type] + [part for part in column if part]).replace("%", "_pct")
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") + ("_p90" if per90 else "")
+
+# Every metric any chart shows, for every player of the given leagues and seasons, as one tidy table:
+# a row per (league, season, team, player) with float32 metrics and categorical league, season and team.
+# Each stat table is read once for all leagues and seasons and its per 90 values come straight from charted().
+def export_metrics(leagues, seasons, output=None):
+    fbref = get_fbref(leagues, seasons)
+    base = read_stat_table(fbref, "standard").frame
+    base = base[~base.index.duplicated()]
+    columns = {"90s": full_90s(base).to_numpy(dtype=np.float32)}
+
+    for stat_type in stat_types:
+        table = read_stat_table(fbref, stat_type)
+        charted = table.charted()
+        unique = ~table.frame.index.duplicated()
+        rows = pd.Index(table.frame.index[unique]).get_indexer(base.index)
+        for (column, per90), i in charted["index"].items():
+            values = charted["values"][unique, i][rows].astype(np.float32)
+            values[rows < 0] = np.nan  # Not in this table
+            columns[metric_column(stat_type, column, per90)] = values
+
+    # Completion of each passing distance and the share of live passes of each pass type, as the charts label them
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for group in ("Short", "Medium", "Long"):
+            columns[f"passing_{group}_Cmp_pct"] = columns[f"passing_{group}_Cmp_p90"] / columns[f"passing_{group}_Att_p90"] * 100
+        live = columns["passing_types_Pass_Types_Live"]
+        for pass_type in ("TB", "Sw", "Crs"):
+            columns[f"passing_types_Pass_Types_{pass_type}_share_pct"] = columns[f"passing_types_Pass_Types_{pass_type}"] / live * 100
+
+    export = pd.DataFrame(columns)
+    for position, level in enumerate(("league", "season", "team")):
+        export.insert(position, level, pd.Categorical(base.index.get_level_values(level)))
+    export.insert(3, "player", base.index.get_level_values("player").astype(str))
+
+    if output:
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if output.suffix.lower() == ".csv":
+            export.to_csv(output, index=False, float_format="%.4g")
+        else:
+            export.to_parquet(output, index=False)
+    return export
+
+
+# Read a batch manifest: CSV with a header row, or a JSON list of objects
+def read_manifest(path):
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+# Players of a manifest row as (name, league, season): p1_name, p1_league, p1_season, p2_name... as many as given
+def manifest_players(row):
+    players = []
+    while row.get(f"p{len(players) + 1}_name"):
+        n = len(players) + 1
+        players.append((row[f"p{n}_name"], league_format(str(row[f"p{n}_league"])), season_format(str(row[f"p{n}_season"]))))
+    return players
+
+# Stats requested by a manifest row, "all" (or nothing) means every chart
+def manifest_stats(row):
+    stats = row.get("stats") or "all"
+    if isinstance(stats, str):
+        stats = [stat.strip() for stat in re.split(r"[;|]", stats) if stat.strip()]
+    if stats == ["all"]:
+        return list(chart_specs)
+    return stats
+
+def file_slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "-", fold_name(text)).strip("-")
+
+# Rendered images on disk, named by a hash of everything that goes into drawing them:
+# the chart spec and colours, the extracted numbers of each player, the format and the style options.
+# The least recently used images are deleted once the folder grows past max_bytes.
+class ImageCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.total_bytes = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, statistic, players, fmt, percentiles=False, blit=False):
+        content = [statistic, chart_specs[statistic], player_colors[:len(players)], players, fmt, bool(percentiles), bool(blit)]
+        return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest() + "." + fmt
+
+    def get(self, key):
+        path = self.directory / key
+        try:
+            image = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            counted("image_misses")
+            return None
+        with self.lock:
+            self.hits += 1
+        counted("image_hits")
+        return image
+
+    def put(self, key, image):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp = self.directory / f"{key}.{threading.get_ident()}.tmp"
+            temp.write_bytes(image)
+            temp.replace(self.directory / key)
+        except OSError:  # The cache is only a speed-up, never fail a chart because of it
+            return
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(path.stat().st_size for path in self.directory.iterdir() if path.suffix != ".tmp")
+            else:
+                self.total_bytes += len(image)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    # Delete the oldest images until the folder is back to 80% of max_bytes
+    def evict(self):
+        images = sorted((path.stat().st_mtime, path.stat().st_size, path) for path in self.directory.iterdir() if path.suffix != ".tmp")
+        self.total_bytes = sum(size for mtime, size, path in images)
+        for mtime, size, path in images[:-1]:
+            if self.total_bytes <= self.max_bytes * 0.8:
+                break
+            try:
+                path.unlink()
+                self.total_bytes -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        return {"bytes": self.total_bytes, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+image_cache = ImageCache(snapshot_dir / "charts", max_bytes=256 * 1024 * 1024)
+
+# Draw already extracted numbers and save them, runs in the render worker processes on their chart templates
+def render_chart(statistic, players, output, percentiles=False, blit=False):
+    start = time.perf_counter()
+    image = chart_template(statistic, len(players), percentiles, blit).image(players, Path(output).suffix[1:].lower())
+    Path(output).write_bytes(image)
+    return time.perf_counter() - start
+
+# Render every requested chart for every pair in the manifest straight to files, without windows.
+# Tables are loaded and players extracted here, only the plain numbers are sent to the render workers.
+def render_batch(manifest, out_dir, fmt="png", workers=1, percentiles=False, blit=False):
+    plt.switch_backend("Agg")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows = read_manifest(manifest) if isinstance(manifest, (str, Path)) else manifest
+
+    timings = []
+    jobs = []
+    for row in rows:
+        players = manifest_players(row)
+        pair = "_vs_".join(f"{file_slug(name)}-{season}" for name, league, season in players)
+
+        for statistic in manifest_stats(row):
+            timing = {"chart": str(out_dir / f"{pair}_{statistic}.{fmt}"), "statistic": statistic, "load_seconds": 0.0, "render_seconds": 0.0, "error": ""}
+            timings.append(timing)
+            trace = timing["trace"] = Trace(f"{statistic}: " + " vs ".join(f"{name} {season}" for name, league, season in players))
+            start = time.perf_counter()
+            try:
+                if not players or not all(league and season for name, league, season in players):
+                    raise ValueError("missing players, or invalid league or season")
+                if statistic not in chart_specs:
+                    raise ValueError(f"invalid statistic '{statistic}'")
+                with activate(trace):
+                    spec = chart_specs[statistic]
+                    extracted = [extract_player(spec, get_fbref(league, season), name) for name, league, season in players]
+                    key = image_cache.key(statistic, extracted, fmt, percentiles, blit)
+                    image = image_cache.get(key)
+                if image is not None:
+                    Path(timing["chart"]).write_bytes(image)
+                    timing["cached"] = True
+                else:
+                    jobs.append((timing, key, (statistic, extracted, timing["chart"], percentiles, blit)))
+            except Exception as e:  # One bad pair should not stop an overnight run
+                timing["error"] = f"{type(e).__name__}: {e}"
+            timing["load_seconds"] = round(time.perf_counter() - start, 3)
+            trace.stop()
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=plt.switch_backend, initargs=("Agg",)) as pool:
+            futures = [(timing, key, pool.submit(render_chart, *job)) for timing, key, job in jobs]
+            for timing, key, future in futures:
+                try:
+                    timing["render_seconds"] = round(future.result(), 3)
+                    image_cache.put(key, Path(timing["chart"]).read_bytes())
+                except Exception as e:
+                    timing["error"] = f"{type(e).__name__}: {e}"
+    else:
+        for timing, key, job in jobs:
+            try:
+                timing["render_seconds"] = round(render_chart(*job), 3)
+                image_cache.put(key, Path(timing["chart"]).read_bytes())
+            except Exception as e:
+                plt.close("all")
+                timing["error"] = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+
+    for timing in timings:
+        trace = timing.pop("trace")
+        trace.add("render", timing["render_seconds"])
+        finish_trace(trace)
+        status = "FAILED" if timing["error"] else "Cached" if timing.pop("cached", False) else "Saved"
+        print(f"Chippy: {status} {Path(timing['chart']).name} (load {timing['load_seconds']}s, render {timing['render_seconds']}s) {timing['error']}".rstrip())
+
+    with open(out_dir / "timings.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["chart", "statistic", "load_seconds", "render_seconds", "error"])
+        writer.writeheader()
+        writer.writerows(timings)
+
+    failed = sum(1 for t in timings if t["error"])
+    print(f"Chippy: Rendered {len(timings) - failed}/{len(timings)} charts in {round(wall, 2)}s with {workers} worker(s), timings saved to {out_dir / 'timings.csv'}")
+    return timings
+
+# Draw already extracted numbers to image bytes, runs in the service's render worker processes
+def render_image(statistic, players, fmt="png", percentiles=False, blit=False):
+    return chart_template(statistic, len(players), percentiles, blit).image(players, fmt)
+
+image_types = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
+
+# GET /compare/<statistic>?p1_name=Mesut&p1_league=ENG&p1_season=2017/18&p2_name=...&format=png&percentiles=1
+# Players are extracted in the request thread from the warm tables, drawing goes to the render pool.
+class ChartHandler(BaseHTTPRequestHandler):
+    server_version = "Chippy"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"]:
+            return self.reply(200, "text/plain", b"ok")
+        if parts == ["stats"]:
+            return self.reply(200, "application/json", json.dumps({"tables": table_cache.stats(), "images": image_cache.stats()}).encode())
+        if len(parts) != 2 or parts[0] != "compare":
+            return self.reply(404, "text/plain", b"use /compare/<statistic>?p1_name=...&p1_league=...&p1_season=...")
+
+        statistic = parts[1]
+        fmt = query.get("format", "png")
+        players = manifest_players(query)
+        if statistic not in chart_specs or fmt not in image_types:
+            return self.reply(400, "text/plain", f"invalid statistic '{statistic}' or format '{fmt}'".encode())
+        if not players or not all(league and season for name, league, season in players):
+            return self.reply(400, "text/plain", b"missing players, or invalid league or season")
+
+        with traced(f"{statistic}: " + " vs ".join(f"{name} {season}" for name, league, season in players)):
+            with timed("queue"):
+                self.server.slots.acquire()
+            try:
+                spec = chart_specs[statistic]
+                try:
+                    extracted = [extract_player(spec, get_fbref(league, season), name) for name, league, season in players]
+                except LookupError as e:
+                    return self.reply(404, "text/plain", str(e).encode())
+                with timed("render"):
+                    image = self.server.render(statistic, extracted, fmt, query.get("percentiles") in ("1", "true", "yes"))
+            except Exception as e:
+                return self.reply(500, "text/plain", f"{type(e).__name__}: {e}".encode())
+            finally:
+                self.server.slots.release()
+        self.reply(200, image_types[fmt], image)
+
+    def reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+# Long running chart service: readers, tables and render processes stay warm between requests.
+# At most max_requests comparisons are worked on at once, the rest wait for a slot.
+class ChartServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, workers=1, max_requests=None, blit=False):
+        super().__init__(address, ChartHandler)
+        self.blit = blit
+        self.slots = threading.BoundedSemaphore(max_requests or workers * 2)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=plt.switch_backend, initargs=("Agg",)) if workers > 1 else None
+        self.draw_lock = threading.Lock()
+
+    # Popular comparisons are served from the image cache without touching matplotlib
+    def render(self, statistic, players, fmt, percentiles):
+        key = image_cache.key(statistic, players, fmt, percentiles, self.blit)
+        image = image_cache.get(key)
+        if image is not None:
+            return image
+        if self.pool:
+            image = self.pool.submit(render_image, statistic, players, fmt, percentiles, self.blit).result()
+        else:
+            # pyplot is not thread safe, without render processes the request threads take turns drawing
+            with self.draw_lock:
+                image = render_image(statistic, players, fmt, percentiles, self.blit)
+        image_cache.put(key, image)
+        return image
+
+    def server_close(self):
+        super().server_close()
+        if self.pool:
+            self.pool.shutdown()
+
+def serve(host="127.0.0.1", port=8000, workers=1, max_requests=None, blit=False):
+    plt.switch_backend("Agg")
+    server = ChartServer((host, port), workers, max_requests, blit)
+    print(f"Chippy: Serving charts on http://{host}:{server.server_port}/compare/<statistic> with {workers} render worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
 def main():
     print('================================================================')
     # Select First Player
@@ -964,15 +2022,19 @@ def main():
             print("\t [3] Serie A")
             print("\t [4] Bundesliga")
             print("\t [5] Ligue 1")
+            print("\t [0] Not sure, search all five")
             p1_league = input("P1 - League: ")
             p1_year = input("P1 - Season: ")
         
         print("Chippy: Checking if player exists...")
         
-        if (league_format(p1_league) and season_format(p1_year)):
-            player1Name = get_player(p1_name, league_format(p1_league), season_format(p1_year))
-            if (player1Name):
-                print("Chippy: Found '" + player1Name + "'!")
+        if ((league_format(p1_league) or p1_league in ("", "0")) and season_format(p1_year)):
+            player1 = pick_player(p1_name, league_format(p1_league) or None, season_format(p1_year))
+            if (player1):
+                p1_name = player1Name = player1["player"]
+                p1_league = player1["league"]
+                print("Chippy: Found '" + player1Name + "' (" + player1["team"] + ", " + p1_league + ")!")
+                prefetch_tables(league_format(p1_league), season_format(p1_year))
                 firstPlayer = True
             else:
                 print("Chippy: '" + str(p1_name) + "' who played in '" + str(p1_league) + "' during '" + str(p1_year) + "' does not exist, try again.")
@@ -997,15 +2059,19 @@ def main():
             print("\t [3] Serie A")
             print("\t [4] Bundesliga")
             print("\t [5] Ligue 1")
+            print("\t [0] Not sure, search all five")
             p2_league = input("P2 - League: ")
             p2_year = input("P2 - Season: ")
         
         print("Chippy: Checking if player exists...")
         
-        if (league_format(p2_league) and season_format(p2_year)):
-            player2Name = get_player(p2_name, league_format(p2_league), season_format(p2_year))
-            if (player2Name):
-                print("Chippy: Found '" + player2Name + "'!")
+        if ((league_format(p2_league) or p2_league in ("", "0")) and season_format(p2_year)):
+            player2 = pick_player(p2_name, league_format(p2_league) or None, season_format(p2_year))
+            if (player2):
+                p2_name = player2Name = player2["player"]
+                p2_league = player2["league"]
+                print("Chippy: Found '" + player2Name + "' (" + player2["team"] + ", " + p2_league + ")!")
+                prefetch_tables(league_format(p2_league), season_format(p2_year))
                 secondPlayer = True
             else:
                 print("Chippy: '" + str(p2_name) + "' who played in '" + str(p2_league) + "' during '" + str(p2_year) + "' does not exist, try again.")
@@ -1030,6 +2096,7 @@ def main():
             6: 'possession',
             7: 'pass_types',
             8: 'passing_distance',
+            9: 'full_report',
         }
 
         # Loop through all possible stats
@@ -1038,7 +2105,7 @@ def main():
             print(f"[{key}] {formatted_value}")
 
         # What they choose
-        stat = input("Chippy: Please select a stat type by entering a number (1-8): \n").lower()
+        stat = input("Chippy: Please select a stat type by entering a number (1-9): \n").lower()
 
         if stat == 'EXIT':
             break
@@ -1052,12 +2119,179 @@ def main():
             if stat_index in stats:
                 statistic = stats[stat_index]
                 print("Chippy: Loading '" + statistic.replace('_', ' ').title() + "' for " + player1Name + " and " + player2Name + ".")
-                compare_statistics(statistic, p1_name, season_format(p1_year), league_format(p1_league), p2_name, season_format(p2_year), league_format(p2_league))
+                if statistic == 'full_report':
+                    player_report([(p1_name, league_format(p1_league), season_format(p1_year)), (p2_name, league_format(p2_league), season_format(p2_year))])
+                else:
+                    compare_statistics(statistic, p1_name, season_format(p1_year), league_format(p1_league), p2_name, season_format(p2_year), league_format(p2_league))
                 print(f"Chippy: Statistic has been assigned the value: '{statistic}'")
             else:
                 print("Chippy: Invalid index, try again")
 
         print('================================================================')
 
+# Command line, no arguments starts the interactive menu
+def cli(argv=None):
+    parser = argparse.ArgumentParser(prog="chippy", description="Chippy, your favourite football graph generator!")
+    parser.add_argument("--profile-startup", action="store_true", help="print the startup time and how long each heavy import took")
+    parser.add_argument("--data-dir", metavar="DIR", help="read player tables from files in DIR (see record) instead of FBref")
+    parser.add_argument("--trace", metavar="FILE", help="append per-stage timings and cache counters of every comparison to FILE as JSON lines")
+    parser.add_argument("--trace-summary", action="store_true", help="print stage timings and cache counters over all comparisons at exit")
+    commands = parser.add_subparsers(dest="command")
+
+    batch = commands.add_parser("batch", help="render charts for a manifest of player pairs without opening windows")
+    batch.add_argument("manifest", help="CSV or JSON with p1_name, p1_league, p1_season, p2_name, p2_league, p2_season (p3_... for more players) and optional stats")
+    batch.add_argument("--out", default="charts", help="output directory (default: charts)")
+    batch.add_argument("--format", default="png", choices=["png", "svg", "pdf"], help="image format (default: png)")
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="render processes (default: one per core)")
+    batch.add_argument("--percentiles", action="store_true", help="place radar points by league percentile instead of against each other")
+    batch.add_argument("--blit", action="store_true", help="faster radar PNGs from a pre-rendered background, on the full untrimmed figure")
+
+    report = commands.add_parser("report", help="all eight charts for some players on one figure")
+    report.add_argument("--player", nargs=3, action="append", required=True, metavar=("NAME", "LEAGUE", "SEASON"), help="a player, e.g. --player Mesut ENG 2017/18, repeat for more")
+    report.add_argument("--out", help="save to this file (PNG, PDF...) instead of opening a window")
+    report.add_argument("--percentiles", action="store_true", help="place radar points by league percentile instead of against each other")
+
+    teams = commands.add_parser("teams", help="compare teams on a chart, minutes-weighted over their players")
+    teams.add_argument("stat", choices=list(chart_specs), help="chart")
+    teams.add_argument("--team", nargs=3, action="append", required=True, metavar=("NAME", "LEAGUE", "SEASON"), help="a team, e.g. --team Arsenal ENG 2022/23, repeat for more")
+    teams.add_argument("--out", help="save to this file instead of opening a window")
+    teams.add_argument("--percentiles", action="store_true", help="place radar points by percentile among the league's teams")
+
+    leagues = commands.add_parser("leagues", help="compare leagues on a chart, minutes-weighted over their players")
+    leagues.add_argument("stat", choices=list(chart_specs), help="chart")
+    leagues.add_argument("--league", nargs=2, action="append", required=True, metavar=("LEAGUE", "SEASON"), help="a league, e.g. --league ENG 2022/23, repeat for more")
+    leagues.add_argument("--out", help="save to this file instead of opening a window")
+    leagues.add_argument("--percentiles", action="store_true", help="place radar points by percentile among the big five leagues")
+
+    career = commands.add_parser("career", help="chart one player's per 90 trend across a range of seasons")
+    career.add_argument("name", help="player name")
+    career.add_argument("league", help="league, as in the menu (ENG, 1, Premier League...)")
+    career.add_argument("first", help="first season, e.g. 2018/19")
+    career.add_argument("last", help="last season, e.g. 2022/23")
+    career.add_argument("--stat", default="standard", choices=list(chart_specs), help="chart to trend (default: standard)")
+    career.add_argument("--out", help="save to this file instead of opening a window")
+
+    similar = commands.add_parser("similar", help="find the players whose per 90 profile is closest to a player's")
+    similar.add_argument("name", help="player name")
+    similar.add_argument("season", help="season, e.g. 2022/23")
+    similar.add_argument("--league", help="only match the name in this league")
+    similar.add_argument("-k", type=int, default=10, help="number of players (default: 10)")
+    similar.add_argument("--min-90s", type=float, default=5, help="ignore players with fewer full 90s (default: 5)")
+
+    find = commands.add_parser("find", help="list the players matching a name and their league and team, forgiving typos")
+    find.add_argument("name", help="player name, or part of it")
+    find.add_argument("season", help="season, e.g. 2022/23")
+    find.add_argument("--league", help="only search this league (default: all five)")
+    find.add_argument("-k", type=int, default=5, help="number of players (default: 5)")
+
+    leaders = commands.add_parser("leaders", help="top players for a metric, e.g. \"Progressive Carries\"")
+    leaders.add_argument("metric", help="chart label (\"Key Passes\") or stat_type:column (\"possession:Carries/PrgC\")")
+    leaders.add_argument("season", help="season, e.g. 2022/23")
+    leaders.add_argument("--league", help="one league instead of all five")
+    leaders.add_argument("-n", type=int, default=10, help="number of players (default: 10)")
+    leaders.add_argument("--min-90s", type=float, default=10, help="minimum full 90s played (default: 10)")
+
+    service = commands.add_parser("serve", help="run a local HTTP service that returns chart images, keeping tables warm")
+    service.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    service.add_argument("--port", type=int, default=8000, help="port (default: 8000)")
+    service.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="render processes (default: one per core)")
+    service.add_argument("--max-requests", type=int, help="comparisons worked on at once (default: twice the workers)")
+    service.add_argument("--blit", action="store_true", help="faster radar PNGs from a pre-rendered background, on the full untrimmed figure")
+
+    export = commands.add_parser("export", help="save every chart metric for every player of some leagues and seasons as one table")
+    export.add_argument("out", help="output file, .parquet or .csv")
+    export.add_argument("--league", action="append", help="league, repeat for more (default: all five)")
+    export.add_argument("--season", action="append", required=True, help="season, e.g. 2022/23, repeat for more")
+
+    record = commands.add_parser("record", help="save a league-season's player tables as files for --data-dir")
+    record.add_argument("league", help="league, as in the menu (ENG, 1, Premier League...)")
+    record.add_argument("season", help="season, e.g. 2022/23")
+    record.add_argument("--out", default="fbref_tables", help="output directory (default: fbref_tables)")
+    record.add_argument("--format", default="parquet", choices=["parquet", "csv"], help="file format (default: parquet)")
+
+    args = parser.parse_args(argv)
+    if args.profile_startup:
+        profile_startup()
+    if args.data_dir:
+        use_local_data(args.data_dir)
+    if args.trace:
+        global trace_path
+        trace_path = args.trace
+    if args.trace_summary:
+        atexit.register(trace_summary)
+    if args.command == "leaders":
+        leagues = league_format(args.league) if args.league else big_five_leagues
+        if not season_format(args.season) or not leagues:
+            parser.error("invalid league or season")
+        if fold_name(args.metric) not in leaderboard_metrics():
+            parser.error("unknown metric, try one of: " + ", ".join(sorted({metric[3] for metric in leaderboard_metrics().values() if metric[3]})))
+        label, leaders = leaderboard(args.metric, season_format(args.season), args.n, leagues, args.min_90s)
+        print(f"Chippy: {label} leaders in {args.season} (at least {args.min_90s} full 90s):")
+        for rank, leader in enumerate(leaders, start=1):
+            print(f"\t[{rank}] {leader['player']} ({leader['team']}, {leader['league']}) - {leader['value']} - Full 90s: {leader['90s']}")
+    elif args.command == "similar":
+        league = league_format(args.league) if args.league else None
+        if not season_format(args.season) or league is False:
+            parser.error("invalid league or season")
+        start = time.perf_counter()
+        target, matches = similar_players(args.name, season_format(args.season), args.k, league, min_90s=args.min_90s)
+        print(f"Chippy: Players most similar to {target[3]} ({target[2]}, {season_display(target[1])}) in {round(time.perf_counter() - start, 3)}s:")
+        for rank, match in enumerate(matches, start=1):
+            print(f"\t[{rank}] {match['player']} ({match['team']}, {match['league']}) - Full 90s: {match['90s']}, distance {match['distance']}")
+    elif args.command == "find":
+        league = league_format(args.league) if args.league else None
+        if not season_format(args.season) or league is False:
+            parser.error("invalid league or season")
+        candidates = find_players(args.name, league, season_format(args.season), args.k)
+        if not candidates:
+            print(f"Chippy: No player close to '{args.name}'.")
+        for rank, candidate in enumerate(candidates, start=1):
+            print(f"\t[{rank}] {candidate['player']} ({candidate['team']}, {candidate['league']}) - Full 90s: {candidate['90s']}" + ("" if candidate["score"] == 1.0 else f", similarity {candidate['score']}"))
+    elif args.command == "report":
+        players = [(name, league_format(league), season_format(season)) for name, league, season in args.player]
+        if not all(league and season for name, league, season in players):
+            parser.error("invalid league or season")
+        if args.out:
+            plt.switch_backend("Agg")
+        player_report(players, args.out, args.percentiles)
+    elif args.command in ("teams", "leagues"):
+        if args.command == "teams":
+            groups = [(name, league_format(league), season_format(season)) for name, league, season in args.team]
+        else:
+            groups = [(league_format(league), season_format(season)) for league, season in args.league]
+        if not all(all(group[-2:]) for group in groups):
+            parser.error("invalid league or season")
+        if args.out:
+            plt.switch_backend("Agg")
+        (compare_teams if args.command == "teams" else compare_leagues)(args.stat, groups, args.out, args.percentiles)
+    elif args.command == "career":
+        if args.out:
+            plt.switch_backend("Agg")
+        seasons = season_range(args.first, args.last)
+        if not (league_format(args.league) and seasons):
+            parser.error("invalid league or seasons")
+        compare_career(args.stat, args.name, league_format(args.league), seasons, args.out)
+    elif args.command == "export":
+        leagues = [league_format(league) for league in args.league] if args.league else big_five_leagues
+        seasons = [season_format(season) for season in args.season]
+        if not all(leagues) or not all(seasons):
+            parser.error("invalid league or season")
+        start = time.perf_counter()
+        export = export_metrics(leagues, seasons, args.out)
+        print(f"Chippy: Exported {len(export.columns) - 5} metrics for {len(export)} players to {args.out} in {round(time.perf_counter() - start, 2)}s")
+    elif args.command == "record":
+        if not league_format(args.league) or not season_format(args.season):
+            parser.error("invalid league or season")
+        fbref = get_fbref(league_format(args.league), season_format(args.season))
+        for stat_type in stat_types:
+            for path in save_local_tables(fbref.read_player_season_stats(stat_type=stat_type), args.out, stat_type, args.format):
+                print(f"Chippy: Saved {path}")
+    elif args.command == "serve":
+        serve(args.host, args.port, args.workers, args.max_requests, args.blit)
+    elif args.command == "batch":
+        render_batch(args.manifest, args.out, args.format, args.workers, args.percentiles, args.blit)
+    else:
+        main()
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,154 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from matplotlib.patches import Wedge
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+sys.path.insert(0, str(root / "benchmarks"))
+
+import chippy
+import synthetic
+
+
+
+# Behaviour checks on the synthetic FBref tables of benchmarks/synthetic.py, no network needed
+
+league = "ENG-Premier League"
+
+@pytest.fixture(scope="module")
+def fbref(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("tables")
+    synthetic.generate(directory, [league], ["2223"], players=300)
+    chippy.plt.switch_backend("Agg")
+    chippy.snapshot_dir = directory / "snapshots"
+    chippy.use_local_data(directory)
+    chippy.table_cache.clear()
+    return chippy.get_fbref(league, "2022")
+
+def standard(fbref):
+    return chippy.read_stat_table(fbref, "standard")
+
+def test_lookup_exact_and_folded(fbref):
+    names = standard(fbref).names
+    for query in ("Mesut Özil", "mesut ozil", "MESUT OZIL", "Mesut Ö"):
+        assert names.folded[names.lookup(query)[0]] == "mesut ozil"
+
+def test_lookup_ranks_by_minutes(fbref):
+    table = standard(fbref)
+    positions = table.names.lookup("Silva")
+    assert len(positions) > 1
+    nineties = [table.names.nineties[pos] for pos in positions]
+    assert nineties == sorted(nineties, reverse=True)
+    assert all("silva" in table.names.folded[pos].split() for pos in positions)
+
+def test_lookup_prefers_whole_words_to_prefixes():
+    names = chippy.NameIndex(["Bernardo Silva", "Thiago Silva", "Silvan Widmer", "David Silva", "Kaneki Something", "Harry Kane"], np.array([30.0, 20.0, 25.0, 10.0, 5.0, 33.0]))
+    assert [names.folded[pos] for pos in names.lookup("Silva")] == ["bernardo silva", "thiago silva", "david silva"]
+    assert [names.folded[pos] for pos in names.lookup("Kane")] == ["harry kane"]
+    assert "silvan widmer" in [names.folded[pos] for pos in names.lookup("Silv")]
+
+def test_fuzzy_finds_misspelt_names(fbref):
+    table = standard(fbref)
+    assert table.names.lookup("Kevn De Bruyne") == []
+    candidates = table.candidates("Kevn De Bruyne")
+    assert candidates[0]["score"] < 1
+    assert chippy.fold_name(candidates[0]["player"]).startswith("kevin de bruyne")
+    assert table.candidates("zzzz") == []
+
+def test_charted_values_are_per_90(fbref):
+    table = chippy.read_stat_table(fbref, "possession")
+    charted = table.charted()
+    frame = table.frame
+    for column, per90 in [(("Carries", "PrgC"), True), (("Touches", "Att 3rd"), False), (("Take-Ons", "Succ%"), False)]:
+        expected = frame[column].to_numpy(dtype=float).copy()
+        if per90:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                expected = expected / frame["90s"].to_numpy(dtype=float)
+        expected[~np.isfinite(expected)] = np.nan
+        np.testing.assert_allclose(charted["values"][:, charted["index"][(column, per90)]], expected)
+
+def test_percentiles_rank_against_regulars(fbref):
+    values = np.array([[9.0], [1.0], [2.0], [3.0], [np.nan]])
+    regulars = np.array([False, True, True, True, True])
+    percentiles = chippy.regular_percentiles(values, regulars)
+    np.testing.assert_allclose(percentiles[:4, 0], [100, 100 / 3, 200 / 3, 100])
+    assert np.isnan(percentiles[4, 0])
+
+def test_aggregated_ratios_and_per_90(fbref):
+    table = chippy.read_stat_table(fbref, "passing")
+    aggregated = table.aggregated("team")
+    team = aggregated["groups"][0]
+    rows = table.frame.xs(team[2], level="team")
+    position = aggregated["groups"].get_loc(team)
+    values = aggregated["values"][position]
+    index = aggregated["index"]
+
+    assert values[index[(("Total", "Cmp%"), False)]] == pytest.approx(rows[("Total", "Cmp")].sum() / rows[("Total", "Att")].sum() * 100)
+    assert values[index[(("KP", ""), True)]] == pytest.approx(rows[("KP", "")].sum() / rows[("90s", "")].sum())
+    assert aggregated["90s"][position] == pytest.approx(rows[("90s", "")].sum())
+
+def test_template_matches_fresh_figure(fbref):
+    for statistic in ("standard", "possession", "passing_distance"):
+        spec = chippy.chart_specs[statistic]
+        template = chippy.ChartTemplate(statistic, 2)
+        for pair in (("Mesut", "De Bruyne"), ("Silva", "Kane")):
+            players = [chippy.extract_player(spec, fbref, name) for name in pair]
+            fig = chippy.draw_chart(statistic, players)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", bbox_inches="tight")
+            chippy.plt.close(fig)
+            fresh = chippy.plt.imread(io.BytesIO(buffer.getvalue()))
+            reused = chippy.plt.imread(io.BytesIO(template.image(players)))
+            assert fresh.shape == reused.shape
+            assert np.array_equal(fresh, reused)
+
+def test_season_start_orders_across_centuries():
+    assert sorted(["0001", "9900", "2223", "9899"], key=chippy.season_start) == ["9899", "9900", "0001", "2223"]
+
+def test_csv_tables_keep_season_keys(tmp_path):
+    synthetic.generate(tmp_path, [league], ["0910"], players=20, fmt="csv")
+    frame = chippy.read_local_table(tmp_path, league, "0910", "standard")
+    assert set(frame.index.get_level_values("season")) == {"0910"}
+    assert frame[("Playing Time", "90s")].dtype == float
+
+def test_season_keys_round_trip(tmp_path):
+    seasons = ["1920", "2021", "2122"]
+    assert [chippy.season_key(season) for season in seasons] == seasons
+    assert chippy.season_key("2020") == "2021"
+    synthetic.generate(tmp_path, [league], seasons, players=20)
+    assert len(list(tmp_path.glob("*_standard.parquet"))) == len(seasons)
+    for season in seasons:
+        frame = chippy.LocalFBref(tmp_path, league, season).read_player_season_stats()
+        assert set(frame.index.get_level_values("season")) == {season}
+
+def test_blit_matches_full_draw(fbref):
+    spec = chippy.chart_specs["playmaking"]
+    template = chippy.ChartTemplate("playmaking", 2, blit=True)
+    for pair in (("Mesut", "De Bruyne"), ("Silva", "Kane")):
+        players = [chippy.extract_player(spec, fbref, name) for name in pair]
+        blitted = chippy.plt.imread(io.BytesIO(template.image(players)))
+        fig = chippy.draw_chart("playmaking", players)
+        fig.canvas.draw()
+        full = np.asarray(fig.canvas.buffer_rgba()) / 255
+        chippy.plt.close(fig)
+        np.testing.assert_allclose(blitted, full, atol=1e-6)
+
+def test_report_pie_legends_stay_in_their_columns(fbref):
+    for pair in (("Mesut", "De Bruyne"), ("Mesut", "De Bruyne", "Silva")):
+        charts = {statistic: [chippy.extract_player(spec, fbref, name) for name in pair] for statistic, spec in chippy.chart_specs.items()}
+        fig = chippy.draw_report(charts)
+        fig.canvas.draw()
+        renderer = fig.canvas.get_renderer()
+        pies = [ax for ax in fig.axes if ax.get_legend() and isinstance(ax.patches[0], Wedge)]
+        assert len(pies) == 2 * len(pair)
+        for ax in pies:
+            legend = ax.get_legend().get_window_extent(renderer)
+            assert legend.x1 <= fig.bbox.x1
+            for other in pies:
+                drawn = [other.title] + other.patches + other.texts + ([other.get_legend()] if other is not ax else [])
+                assert not any(legend.overlaps(artist.get_window_extent(renderer)) for artist in drawn)
+        chippy.plt.close(fig)